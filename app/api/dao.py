@@ -1,12 +1,42 @@
 from app.base_dao import BaseDAO
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from sqlalchemy import select, func
+import json
+import html
+from typing import List, AsyncIterator
+from datetime import datetime, timezone
+from sqlalchemy import select, func, tuple_, update, insert, or_, bindparam, literal_column
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from pydantic_core import to_json
 from sqlalchemy.exc import SQLAlchemyError
-from app.logger import logger
+from sqlalchemy.dialects.postgresql import insert as pg_insert, aggregate_order_by, JSON
+from app.logger import dao_logger as logger
 from app.api.schemas import *
-from sqlalchemy.orm import joinedload, selectinload
-from .models import MBlogFullResponse
+from sqlalchemy.orm import joinedload, selectinload, load_only, defer
+from .models import (MBlogFullResponse, MBlogSearchResult, MBlogSummary, MBlogImport, TagResponse, UserBase,
+                     blog_list_adapter, blog_summary_list_adapter, blog_export_list_adapter)
+from app.auth.schemas import User
+from .schemas import SEARCH_CONFIG
+from .pagination import encode_cursor, decode_cursor, encode_search_cursor, decode_search_cursor
+from .render import RENDERER_VERSION, render_markdown, is_rendered
+from .tag_index import tag_index
+from app.cache import TTLCache
+from app.response_cache import response_cache
+from app.config import (BLOG_READ_PATH, EXPORT_BATCH_SIZE, BLOG_COUNT_MODE, BLOG_COUNT_CACHE_TTL, BLOG_COUNT_CACHE_SIZE,
+                        BLOG_COUNT_ESTIMATE_THRESHOLD, TAG_MATCH_MODE)
+
+
+HIGHLIGHT_START = '__hl_start__'
+HIGHLIGHT_STOP = '__hl_stop__'
+
+
+def highlight_snippet(snippet: str) -> str:
+    """
+    Экранирует фрагмент текста блога и заменяет маркеры ts_headline на <mark>,
+    чтобы фрагмент можно было безопасно вывести как HTML.
+    """
+    escaped = html.escape(snippet or '')
+    return escaped.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
 
 
 class TagDAO(BaseDAO):
@@ -16,63 +46,295 @@ class TagDAO(BaseDAO):
     async def add_tags(cls, db: AsyncSession, tag_names: List[str]) -> List[int]:
         """
         Метод для добавления тегов в базу данных.
-        Принимает список строк (тегов), проверяет, существуют ли они в базе данных,
-        добавляет новые и возвращает список ID тегов.
+        Принимает список строк (тегов), приводит их к нижнему регистру и удаляет дубли,
+        одним запросом INSERT ... ON CONFLICT (name) DO NOTHING добавляет новые теги,
+        а ID уже существующих получает одним SELECT. Безопасен при одновременном
+        создании одного и того же тега несколькими запросами.
 
         :param session: Сессия базы данных.
-        :param tag_names: Список тегов в нижнем регистре.
-        :return: Список ID тегов.
+        :param tag_names: Список тегов.
+        :return: Список ID тегов в порядке первого вхождения.
         """
+        tag_ids_by_name = await cls.upsert_tags(db=db, tag_names=tag_names)
+        return list(tag_ids_by_name.values())
 
-        tag_ids = []
-        for tag_name in tag_names:
-            tag_name.lower()
-            stmt = select(cls.model).filter_by(name=tag_name)
-            result = await db.execute(stmt)
-            tag = result.scalars().first()
+    @classmethod
+    async def upsert_tags(cls, db: AsyncSession, tag_names: List[str]) -> dict[str, int]:
+        """
+        Set-based upsert тегов (см. add_tags).
 
-            if tag:
-                tag_ids.append(tag.id)
-            else:
-                new_tag = cls.model(name=tag_name)
-                db.add(new_tag)
-                try:
-                    await db.commit()
-                    await db.flush()
-                    logger.info(f'Тег "{tag_name}" добавлен в базу данных.')
-                    tag_ids.append(new_tag.id)
+        :param session: Сессия базы данных.
+        :param tag_names: Список тегов.
+        :return: Словарь {имя тега в нижнем регистре: ID} в порядке первого вхождения.
+        """
+        names = list(dict.fromkeys(name.strip().lower() for name in tag_names if name and name.strip()))
+        if not names:
+            return {}
 
-                except SQLAlchemyError as e:
-                    await db.rollback()
-                    logger.info(f'Ошибка при добавлении тега "{tag_name}": {e}')
-                    raise
-        return tag_ids
+        try:
+            insert_stmt = (
+                pg_insert(cls.model)
+                .values([{'name': name} for name in names])
+                .on_conflict_do_nothing(index_elements=['name'])
+                .returning(cls.model.id, cls.model.name)
+            )
+            result = await db.execute(insert_stmt)
+            tag_ids_by_name = {row.name: row.id for row in result.all()}
+
+            existing_names = [name for name in names if name not in tag_ids_by_name]
+            if existing_names:
+                result = await db.execute(
+                    select(cls.model.id, cls.model.name).filter(cls.model.name.in_(existing_names))
+                )
+                tag_ids_by_name.update({row.name: row.id for row in result.all()})
+
+            await cls._commit(db)
+        except SQLAlchemyError as e:
+            await cls._rollback(db)
+            logger.info('Ошибка при добавлении тегов %s: %s', names, e)
+            raise
+
+        logger.info('Добавлено новых тегов: %s из %s.', len(names) - len(existing_names), len(names))
+        return {name: tag_ids_by_name[name] for name in names if name in tag_ids_by_name}
 
 
 class BlogDAO(BaseDAO):
     model = Blog
+    count_cache = TTLCache(maxsize=BLOG_COUNT_CACHE_SIZE, ttl=BLOG_COUNT_CACHE_TTL)
+    read_path = BLOG_READ_PATH
+    # Версия ленты: время последнего изменения набора опубликованных блогов в этом процессе
+    # (UTC без часового пояса, как updated_at). Входит в валидаторы ленты
+    feed_changed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    def invalidate_counts(cls) -> None:
+        """
+        Сбрасывает кэш количества блогов и обновляет версию ленты. Вызывается при добавлении,
+        удалении и смене статуса блога.
+        """
+        cls.count_cache.clear()
+        cls.feed_changed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    def feed_cache_tags(cls, author_id: int = None, tag: str = None, tag_match: str = None) -> List[str]:
+        """
+        Теги записи кэша ответов для страницы ленты с заданными фильтрами.
+        Страница автора зависит только от его блогов, страница тега - только от блогов с этим тегом,
+        страницы с неточным сравнением тега - от любых блогов с тегами.
+        """
+        if author_id is not None:
+            return [f'author:{author_id}']
+        if tag:
+            if (tag_match or TAG_MATCH_MODE) == 'exact':
+                return [f'tag:{tag.strip().lower()}']
+            return ['tag-match']
+        return ['feed:all']
+
+    @classmethod
+    async def purge_feed_cache(cls, author_id: int, tag_names: List[str]) -> None:
+        """
+        Удаляет из кэша ответов страницы ленты, на которые влияет блог автора с указанными тегами.
+        """
+        if response_cache is None:
+            return
+        tags = ['feed:all', f'author:{author_id}']
+        tags += [f'tag:{name.strip().lower()}' for name in tag_names if name.strip()]
+        if tag_names:
+            tags.append('tag-match')
+        purged = await response_cache.purge_tags(tags)
+        logger.info('Из кэша ответов удалено %s страниц ленты (автор %s)', purged, author_id)
+
+    @classmethod
+    def _tag_filter(cls, tag: str, tag_match: str = None):
+        """
+        Условие EXISTS по связке blogtags -> tags для фильтра по тегу.
+        Полусоединение не размножает строки блогов, поэтому дубли не возникают
+        и подсчет количества остается точным.
+
+        Режимы сравнения:
+        - exact: точное совпадение (уникальный индекс tags.name);
+        - prefix: тег начинается с подстроки (индекс ix_tags_name_pattern);
+        - fuzzy: подстрока или похожее по триграммам имя (GIN-индекс ix_tags_name_trgm).
+        """
+        tag_match = tag_match or TAG_MATCH_MODE
+        name = tag.strip().lower()
+        pattern = name.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+
+        if tag_match == 'prefix':
+            condition = Tag.name.like(f'{pattern}%', escape='!')
+        elif tag_match == 'fuzzy':
+            condition = or_(Tag.name.ilike(f'%{pattern}%', escape='!'), Tag.name.op('%')(name))
+        else:
+            condition = Tag.name == name
+
+        return (
+            select(BlogTag.blog_id)
+            .join(Tag, Tag.id == BlogTag.tag_id)
+            .where(BlogTag.blog_id == cls.model.id, condition)
+            .exists()
+        )
+
+    @classmethod
+    def _apply_list_filters(cls, query, author_id: int = None, tag: str = None, tag_match: str = None):
+        # Явные условия по колонкам Blog: filter_by относится к последней присоединенной сущности,
+        # а запрос Core для полного представления присоединяет users
+        query = query.where(cls.model.status == 'published')
+
+        if author_id is not None:
+            query = query.where(cls.model.author == author_id)
+
+        if tag:
+            query = query.filter(cls._tag_filter(tag, tag_match))
+
+        return query
+
+    @classmethod
+    async def count_list_blog(cls, db: AsyncSession, author_id: int = None, tag: str = None,
+                              count_mode: str = None, tag_match: str = None) -> int:
+        """
+        Метод для подсчета количества опубликованных блогов с учетом фильтров.
+
+        Поддерживаются стратегии:
+        - exact: точный COUNT по id без eager-загрузок;
+        - cached: точный COUNT, закэшированный на BLOG_COUNT_CACHE_TTL секунд для каждой комбинации фильтров;
+        - estimated: оценка планировщика PostgreSQL (EXPLAIN), основанная на той же статистике,
+          что и pg_class.reltuples. Для маленьких выборок выполняется точный подсчет.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param author_id: ID автора для фильтрации
+        :param tag: Тег для фильтрации
+        :param count_mode: Стратегия подсчета, по умолчанию BLOG_COUNT_MODE
+        :param tag_match: Режим сравнения тега: exact, prefix или fuzzy
+        :return: Количество записей
+        """
+        count_mode = count_mode or BLOG_COUNT_MODE
+        id_query = cls._apply_list_filters(select(cls.model.id), author_id=author_id, tag=tag, tag_match=tag_match)
+
+        if count_mode == 'estimated':
+            compiled = id_query.compile(dialect=db.bind.dialect)
+            params = tuple(compiled.params[name] for name in compiled.positiontup)
+            conn = await db.connection()
+            result = await conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', params)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate >= BLOG_COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+            count_mode = 'exact'
+
+        cache_key = (author_id, tag.strip().lower() if tag else None, tag_match or TAG_MATCH_MODE)
+        if count_mode == 'cached':
+            cached = cls.count_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        total_result = await db.scalar(select(func.count()).select_from(id_query.subquery()))
+
+        if count_mode == 'cached':
+            cls.count_cache.set(cache_key, total_result)
+        return total_result
+
+    @classmethod
+    def _core_tags(cls):
+        """
+        Коррелированный подзапрос: теги блога одним JSON-массивом [{"id": ..., "name": ...}].
+        """
+        tag_object = func.json_build_object('id', Tag.id, 'name', Tag.name)
+        return (
+            select(func.coalesce(func.json_agg(aggregate_order_by(tag_object, Tag.id)),
+                                 literal_column("'[]'::json"), type_=JSON))
+            .select_from(BlogTag)
+            .join(Tag, Tag.id == BlogTag.tag_id)
+            .where(BlogTag.blog_id == cls.model.id)
+            .scalar_subquery()
+        )
+
+    @classmethod
+    def _core_blog_query(cls, view: str = 'full'):
+        """
+        Запрос Core для чтения блогов без ORM: строки содержат колонки блога, теги (JSON)
+        и, для полного представления, автора (JSON) из соединения с users.
+        """
+        columns = [cls.model.id, cls.model.author, cls.model.title, cls.model.short_description,
+                   cls.model.created_at, cls.model.status, cls._core_tags().label('tags')]
+        if view == 'summary':
+            return select(*columns)
+
+        user_object = func.json_build_object('id', User.id, 'first_name', User.first_name,
+                                             'last_name', User.last_name, type_=JSON)
+        return (
+            select(*columns, cls.model.content, user_object.label('user'))
+            .join(User, User.id == cls.model.author)
+        )
+
+    @classmethod
+    def _blog_from_row(cls, row, view: str = 'full') -> MBlogFullResponse | MBlogSummary:
+        """
+        Собирает модель ответа из строки _core_blog_query без повторной валидации:
+        типы значений уже гарантированы запросом.
+        """
+        data = row._asdict()
+        data['tags'] = [TagResponse.model_construct(**tag) for tag in row.tags]
+        if view == 'summary':
+            return MBlogSummary.model_construct(**data)
+        data['user'] = UserBase.model_construct(**row.user)
+        return MBlogFullResponse.model_construct(**data)
+
+    @classmethod
+    async def get_blog_validator(cls, db: AsyncSession, blog_id: int):
+        """
+        Метод для дешевого получения данных для валидаторов условного GET
+        (updated_at, status, author) без загрузки содержимого блога.
+        """
+        query = select(cls.model.updated_at, cls.model.status, cls.model.author).filter_by(id=blog_id)
+        return (await db.execute(query)).one_or_none()
+
+    @classmethod
+    async def get_page_validator(cls, db: AsyncSession, author_id: int = None, tag: str = None,
+                                 page: int = 1, page_size: int = 10, cursor: str = None, tag_match: str = None):
+        """
+        Метод для получения валидатора страницы ленты: пары (id, updated_at) блогов, которые
+        попадут на страницу с теми же фильтрами, курсором или OFFSET. Читает не больше
+        page_size + 1 строк по индексу сортировки, без подсчета всей ленты. Новый, измененный,
+        удаленный или снятый с публикации блог на странице меняет набор строк.
+        """
+        query = cls._apply_list_filters(select(cls.model.id, cls.model.updated_at), author_id=author_id,
+                                        tag=tag, tag_match=tag_match)
+        query, _ = cls._paginate(query, page=page, page_size=page_size, cursor=cursor)
+        return (await db.execute(query)).all()
 
     @classmethod
     async def get_full_blog_info(cls, db: AsyncSession, blog_id: int, author_id: int = None):
         """
         Метод для получения полной информации о блоге, включая данные об авторе и тегах.
         Для опубликованных блогов доступ к информации открыт всем пользователям.
-        Для черновиков доступ открыт только автору блога.    
+        Для черновиков доступ открыт только автору блога.
+
+        При read_path == 'core' возвращается строка запроса Core (с атрибутами блога,
+        tags и user в виде JSON, а также content_html) вместо ORM-объекта.
         """
+        if cls.read_path == 'core':
+            query = (
+                cls._core_blog_query('full')
+                .add_columns(cls.model.content_html, cls.model.content_html_version)
+                .where(cls.model.id == blog_id)
+            )
+            blog = (await db.execute(query)).one_or_none()
+        else:
+            query = (
+                select(cls.model)
+                .options(
 
-        query = (
-            select(cls.model)
-            .options(
-                
-                joinedload(Blog.user),
-                selectinload(Blog.tags),
+                    joinedload(Blog.user),
+                    selectinload(Blog.tags),
 
+                )
+                .filter_by(id=blog_id)
             )
-            .filter_by(id=blog_id)
-        )
 
-        result = await db.execute(query)
-        blog = result.scalar_one_or_none()
+            result = await db.execute(query)
+            blog = result.scalar_one_or_none()
 
         if not blog:
             return {
@@ -82,7 +344,7 @@ class BlogDAO(BaseDAO):
 
             }
         
-        if blog.status == 'draft' and (author_id != blog.author_id):
+        if blog.status == 'draft' and (author_id != blog.author):
             return {
 
                 'message': 'Этот блог находится в статусе черновика, и доступ к нему имеют только авторы.',
@@ -92,6 +354,112 @@ class BlogDAO(BaseDAO):
 
         return blog
     
+    @classmethod
+    def _with_rendered_content(cls, data: dict) -> dict:
+        """Добавляет к данным блога отрендеренный HTML (вызывается в пуле потоков)."""
+        if data.get('content') is None:
+            return data
+        return {**data, 'content_html': render_markdown(data['content']), 'content_html_version': RENDERER_VERSION}
+
+    @classmethod
+    async def add(cls, data: dict, db: AsyncSession):
+        """
+        Добавляет блог вместе с HTML-представлением содержимого.
+        Markdown рендерится в пуле потоков, чтобы большой блог не блокировал event loop.
+        """
+        data = await run_in_threadpool(cls._with_rendered_content, data)
+        return await super().add(data=data, db=db)
+
+    @classmethod
+    async def add_many(cls, data: List[BaseModel | dict], db: AsyncSession):
+        """Пакетное добавление блогов (см. BaseDAO.add_many) с рендером Markdown в пуле потоков."""
+        data_dict = [item.model_dump(exclude_unset=True) if isinstance(item, BaseModel) else item for item in data]
+        data_dict = await run_in_threadpool(lambda: [cls._with_rendered_content(values) for values in data_dict])
+        return await super().add_many(data=data_dict, db=db)
+
+    @classmethod
+    async def get_rendered_content(cls, db: AsyncSession, blog: Blog) -> str:
+        """
+        Метод для получения HTML-представления блога.
+        HTML рендерится при записи блога; если он отсутствует или был получен
+        другой версией рендерера, блог перерисовывается в пуле потоков и результат сохраняется.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param blog: Блог
+        :return: HTML-представление содержимого блога
+        """
+        if is_rendered(blog):
+            return blog.content_html
+
+        content_html = await run_in_threadpool(render_markdown, blog.content)
+        try:
+            await db.execute(
+                update(cls.model.__table__)
+                .where(cls.model.__table__.c.id == blog.id)
+                .values(
+                    content_html=content_html,
+                    content_html_version=RENDERER_VERSION,
+                    updated_at=cls.model.__table__.c.updated_at,
+                )
+            )
+            await cls._commit(db)
+        except SQLAlchemyError as e:
+            await cls._rollback(db)
+            logger.error("Ошибка при сохранении HTML блога с ID %s: %s", blog.id, e)
+        return content_html
+
+    @classmethod
+    async def backfill_rendered_content(cls, db: AsyncSession, batch_size: int = 500) -> int:
+        """
+        Метод для заполнения content_html у блогов без HTML или с устаревшей версией рендерера.
+        Блоги обрабатываются пачками по возрастанию ID, каждая пачка фиксируется отдельно.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param batch_size: Размер пачки
+        :return: Количество перерисованных блогов
+        """
+        table = cls.model.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam('blog_id'))
+            .values(
+                content_html=bindparam('html'),
+                content_html_version=RENDERER_VERSION,
+                updated_at=table.c.updated_at,
+            )
+        )
+        last_id = 0
+        total = 0
+        while True:
+            query = (
+                select(table.c.id, table.c.content)
+                .where(
+                    table.c.id > last_id,
+                    or_(table.c.content_html_version.is_(None), table.c.content_html_version != RENDERER_VERSION),
+                )
+                .order_by(table.c.id)
+                .limit(batch_size)
+            )
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+
+            params = await run_in_threadpool(
+                lambda: [{'blog_id': row.id, 'html': render_markdown(row.content)} for row in rows]
+            )
+            try:
+                await db.execute(stmt, params)
+                await db.commit()
+            except SQLAlchemyError as e:
+                await db.rollback()
+                logger.error("Ошибка при перерисовке блогов после ID %s: %s", last_id, e)
+                raise
+
+            last_id = rows[-1].id
+            total += len(rows)
+            logger.info("Перерисовано %s блогов (последний ID: %s).", total, last_id)
+        return total
+
     @classmethod
     async def delete_blog(cls, db: AsyncSession, blog_id: int, author_id: int) -> dict:
         """
@@ -113,17 +481,24 @@ class BlogDAO(BaseDAO):
                    'status': 'error',
                 }
 
+            was_published = blog.status == 'published'
+            blog_author = blog.author
+            tag_names = [tag.name for tag in await blog.awaitable_attrs.tags] if was_published else []
+
             await db.delete(blog)
-            await db.commit()
-            await db.flush()
+            await cls._commit(db)
+            cls.invalidate_counts()
+            tag_index.remove_blog(blog_id)
+            if was_published:
+                await cls.purge_feed_cache(blog_author, tag_names)
 
             return {
             'message': f"Блог с ID {blog_id} успешно удален.",
             'status': 'success',
              }
         except SQLAlchemyError as e:
-            await db.rollback()
-            logger.info(f"Ошибка при удалении блога: {e}")
+            await cls._rollback(db)
+            logger.info("Ошибка при удалении блога: %s", e)
             raise
 
     @classmethod
@@ -171,7 +546,15 @@ class BlogDAO(BaseDAO):
                 }
             
             blog.status = new_status
-            await db.commit()
+            await cls._commit(db)
+            cls.invalidate_counts()
+            tag_names = [tag.name for tag in await blog.awaitable_attrs.tags]
+            if tag_index.ready:
+                if new_status == 'published':
+                    tag_index.add_blog(blog_id, tag_names)
+                else:
+                    tag_index.remove_blog(blog_id)
+            await cls.purge_feed_cache(author_id, tag_names)
 
             return {
                 'message': f"Блог с ID {blog_id} успешно изменен в статусе '{new_status}'.",
@@ -180,54 +563,142 @@ class BlogDAO(BaseDAO):
                 'current_status': new_status
             }
         except SQLAlchemyError as e:
-            await db.rollback()
-            logger.info(f"Ошибка при изменении статуса блога: {e}")
+            await cls._rollback(db)
+            logger.info("Ошибка при изменении статуса блога: %s", e)
             raise
 
 
     @classmethod
-    async def get_list_blog(cls, db: AsyncSession, author_id: int = None, tag: str = None, page: int = 1, page_size: int = 10):
-        
-        base_query = select(cls.model).options(
+    def _paginate(cls, query, page: int = 1, page_size: int = 10, cursor: str = None):
+        """
+        Добавляет к запросу ленты сортировку по (created_at, id) и выбор страницы.
+        С курсором страница выбирается условием по (created_at, id) с лишней строкой
+        для признака следующей страницы, без курсора - через OFFSET.
 
-            joinedload(cls.model.user),
-            selectinload(cls.model.tags)
-        ).filter_by(status='published')
+        :return: Кортеж (запрос, направление курсора 'next'/'prev' или None без курсора)
+        """
+        if not cursor:
+            return (
+                query
+                .order_by(cls.model.created_at.desc(), cls.model.id.desc())
+                .offset((page - 1) * page_size)
+                .limit(page_size)
+            ), None
+
+        order_key = tuple_(cls.model.created_at, cls.model.id)
+        cursor_created_at, cursor_id, direction = decode_cursor(cursor)
+        if direction == 'next':
+            query = (
+                query
+                .filter(order_key < tuple_(cursor_created_at, cursor_id))
+                .order_by(cls.model.created_at.desc(), cls.model.id.desc())
+            )
+        else:
+            query = (
+                query
+                .filter(order_key > tuple_(cursor_created_at, cursor_id))
+                .order_by(cls.model.created_at.asc(), cls.model.id.asc())
+            )
+        return query.limit(page_size + 1), direction
 
-        if author_id is not None:
-            base_query = base_query.filter_by(author=author_id)
+    @classmethod
+    async def get_list_blog(cls, db: AsyncSession, author_id: int = None, tag: str = None, page: int = 1,
+                            page_size: int = 10, cursor: str = None, count_mode: str = None,
+                            tag_match: str = None, view: str = 'full'):
+        """
+        Метод для получения списка опубликованных блогов с пагинацией.
+        Блоги упорядочены по (created_at, id) от новых к старым.
 
-        if tag:
-            base_query = base_query.join(cls.model.tags).filter(cls.model.tags.any(Tag.name.ilike(f"%{tag.lower()}%")))
+        Если передан cursor, используется keyset-пагинация: страница выбирается условием
+        по (created_at, id) вместо OFFSET, поэтому время ответа не зависит от глубины листания,
+        а подсчет общего количества записей не выполняется.
 
-        count_query = select(func.count()).select_from(base_query.subquery())
-        total_result = await db.scalar(count_query)
+        При read_path == 'core' страница читается одним запросом Core: теги агрегируются
+        в SQL (json_agg), модели ответа собираются из строк без ORM-гидратации.
 
-        if not total_result:
-            return {
+        :param session: Асинхронная сессия SQLAlchemy
+        :param author_id: ID автора для фильтрации
+        :param tag: Тег для фильтрации
+        :param page: Номер страницы (OFFSET-режим)
+        :param page_size: Количество записей на странице
+        :param cursor: Курсор next_cursor/prev_cursor из предыдущего ответа
+        :param count_mode: Стратегия подсчета total_result (см. count_list_blog)
+        :param tag_match: Режим сравнения тега: exact, prefix или fuzzy
+        :param view: full - MBlogFullResponse с содержимым, summary - MBlogSummary
+                     (загружаются только колонки краткого представления, без content и автора)
+        :return: Словарь со списком блогов и данными пагинации
+        """
+        core = cls.read_path == 'core'
+        if core:
+            base_query = cls._core_blog_query(view)
+        elif view == 'summary':
+            list_adapter = blog_summary_list_adapter
+            base_query = select(cls.model).options(
+
+                load_only(cls.model.id, cls.model.author, cls.model.title, cls.model.short_description,
+                          cls.model.created_at, cls.model.status),
+                selectinload(cls.model.tags)
+            )
+        else:
+            list_adapter = blog_list_adapter
+            base_query = select(cls.model).options(
+
+                defer(cls.model.content_html),
+                joinedload(cls.model.user),
+                selectinload(cls.model.tags)
+            )
+        base_query = cls._apply_list_filters(base_query, author_id=author_id, tag=tag, tag_match=tag_match)
+
+        if cursor:
+            paginated_query, direction = cls._paginate(base_query, page_size=page_size, cursor=cursor)
+            result = await db.execute(paginated_query)
+            blogs = list(result.all() if core else result.scalars().all())
+            has_more = len(blogs) > page_size
+            blogs = blogs[:page_size]
+            if direction == 'prev':
+                blogs.reverse()
+
+            if direction == 'next':
+                has_next, has_prev = has_more, True
+            else:
+                has_next, has_prev = True, has_more
+            total_page = None
+            total_result = None
+        else:
+            total_result = await cls.count_list_blog(db=db, author_id=author_id, tag=tag, count_mode=count_mode,
+                                                     tag_match=tag_match)
 
-                'page': page,
-                'total_page': 0,
-                'total_result': 0,
-                'blogs': [],
+            if not total_result:
+                return {
 
-            }
+                    'page': page,
+                    'total_page': 0,
+                    'total_result': 0,
+                    'blogs': [],
+                    'next_cursor': None,
+                    'prev_cursor': None,
 
-        total_page = (total_result + page_size - 1) // page_size
+                }
 
-        offset = (page - 1) * page_size
-        paginated_query = base_query.offset(offset).limit(page_size)
+            total_page = (total_result + page_size - 1) // page_size
 
-        result = await db.execute(paginated_query)
-        blogs = result.scalars().all()
+            paginated_query, _ = cls._paginate(base_query, page=page, page_size=page_size)
+            result = await db.execute(paginated_query)
+            blogs = result.all() if core else result.scalars().all()
+            has_next, has_prev = page < total_page, page > 1
 
-        unique_blogs = []
-        seen_ids = set()
+        if core:
+            unique_blogs = [cls._blog_from_row(row, view) for row in blogs]
+        else:
+            unique_blogs = list_adapter.validate_python(blogs, from_attributes=True)
 
-        for blog in blogs:
-            if blog.id not in seen_ids:
-                unique_blogs.append(MBlogFullResponse.model_validate(blog))
-                seen_ids.add(blog.id)
+        next_cursor = None
+        prev_cursor = None
+        if unique_blogs:
+            if has_next:
+                next_cursor = encode_cursor(unique_blogs[-1].created_at, unique_blogs[-1].id, 'next')
+            if has_prev:
+                prev_cursor = encode_cursor(unique_blogs[0].created_at, unique_blogs[0].id, 'prev')
 
         filters = []
         if author_id is not None:
@@ -236,13 +707,243 @@ class BlogDAO(BaseDAO):
             filters.append(f"tag={tag}")
         filter_str = " & ".join(filters) if filters else "no filters"
 
-        logger.info(f"Page {page} fetched with {len(blogs)} blogs, filters: {filter_str}")
+        logger.info("Page %s fetched with %s blogs, filters: %s", 'cursor' if cursor else page, len(blogs), filter_str)
         # Формирование результата
         return {
-            "page": page,
+            "page": None if cursor else page,
             "total_page": total_page,
             "total_result": total_result,
-            "blogs": unique_blogs
+            "blogs": unique_blogs,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        }
+
+
+    @classmethod
+    async def get_list_blog_by_tags(cls, db: AsyncSession, tags: List[str], mode: str = 'all', page: int = 1,
+                                    page_size: int = 10, author_id: int = None) -> dict:
+        """
+        Метод для получения опубликованных блогов по нескольким тегам.
+        Если in-memory индекс тегов построен, пересечение (mode=all) или объединение (mode=any)
+        вычисляется в памяти, а из БД загружается только текущая страница через find_by_ids.
+        Иначе (или при фильтре по автору) выполняется запрос с EXISTS по каждому тегу.
+        Блоги упорядочены по ID от новых к старым.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param tags: Список тегов
+        :param mode: all - блоги со всеми тегами, any - хотя бы с одним
+        :param page: Номер страницы
+        :param page_size: Количество записей на странице
+        :param author_id: ID автора для фильтрации
+        :return: Словарь со списком блогов и данными пагинации
+        """
+        names = list(dict.fromkeys(name.strip().lower() for name in tags if name.strip()))
+        load_options = [joinedload(cls.model.user), selectinload(cls.model.tags)]
+        offset = (page - 1) * page_size
+
+        if tag_index.ready and author_id is None:
+            ids = tag_index.query(names, mode=mode)
+            total_result = len(ids)
+            page_ids = ids[offset:offset + page_size]
+            records = await cls.find_by_ids(ids=page_ids, db=db, options=load_options) if page_ids else []
+            records_by_id = {blog.id: blog for blog in records}
+            blogs = [records_by_id[blog_id] for blog_id in page_ids if blog_id in records_by_id]
+        else:
+            if mode == 'any':
+                tag_filters = [
+                    select(BlogTag.blog_id)
+                    .join(Tag, Tag.id == BlogTag.tag_id)
+                    .where(BlogTag.blog_id == cls.model.id, Tag.name.in_(names))
+                    .exists()
+                ]
+            else:
+                tag_filters = [cls._tag_filter(name, 'exact') for name in names]
+
+            id_query = cls._apply_list_filters(select(cls.model.id), author_id=author_id).filter(*tag_filters)
+            total_result = await db.scalar(select(func.count()).select_from(id_query.subquery()))
+
+            query = (
+                cls._apply_list_filters(select(cls.model).options(*load_options), author_id=author_id)
+                .filter(*tag_filters)
+                .order_by(cls.model.id.desc())
+                .offset(offset)
+                .limit(page_size)
+            )
+            blogs = (await db.execute(query)).scalars().all()
+
+        return {
+            'page': page,
+            'total_page': (total_result + page_size - 1) // page_size,
+            'total_result': total_result,
+            'blogs': blog_list_adapter.validate_python(blogs, from_attributes=True),
+            'next_cursor': None,
+            'prev_cursor': None,
+        }
+
+    @classmethod
+    async def stream_export(cls, db: AsyncSession, updated_since: datetime = None,
+                            batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+        """
+        Потоковая выгрузка опубликованных блогов в NDJSON (одна JSON-строка на блог).
+        Строки читаются через серверный курсор (stream_scalars + yield_per) пакетами по batch_size,
+        теги и авторы догружаются на каждый пакет. Identity map сессии хранит объекты по слабым ссылкам,
+        поэтому выгруженные пакеты освобождаются и расход памяти не зависит от размера таблицы.
+        Блоги упорядочены по ID, что позволяет продолжить прерванную выгрузку.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param updated_since: Выгрузить только блоги, измененные после этой даты
+                              (дата с часовым поясом приводится к UTC)
+        :param batch_size: Размер пакета
+        :return: Асинхронный итератор пакетов NDJSON в bytes
+        """
+        query = (
+            select(cls.model)
+            .options(
+                defer(cls.model.content_html),
+                joinedload(cls.model.user),
+                selectinload(cls.model.tags),
+            )
+            .where(cls.model.status == 'published')
+            .order_by(cls.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if updated_since is not None:
+            if updated_since.tzinfo is not None:
+                # updated_at хранится как TIMESTAMP без часового пояса в UTC, asyncpg не сравнивает
+                # его с aware-датой и падает уже после начала ответа
+                updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+            query = query.where(cls.model.updated_at > updated_since)
+
+        result = await db.stream_scalars(query)
+        total = 0
+        async for partition in result.partitions():
+            blogs = blog_export_list_adapter.validate_python(partition, from_attributes=True)
+            yield b''.join(to_json(blog) + b'\n' for blog in blogs)
+            total += len(blogs)
+        logger.info('Выгрузка блогов завершена: %s записей', total)
+
+    @classmethod
+    async def import_blogs(cls, db: AsyncSession, rows: List[tuple[int, MBlogImport]]) -> tuple[list, list]:
+        """
+        Импорт пакета блогов. Авторы проверяются одним запросом, все теги пакета добавляются
+        одним set-based upsert, блоги и связки с тегами вставляются многострочными INSERT
+        в одной транзакции. Если пакет не удалось записать, он повторяется построчно,
+        чтобы ошибочные строки попали в отчет, а остальные были импортированы.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param rows: Список пар (номер строки, блог)
+        :return: Кортеж (импортированные блоги [(id, author, status, теги)], ошибки [{line, error}])
+        """
+        errors = []
+        author_ids = {row.author for _, row in rows}
+        result = await db.execute(select(User.id).where(User.id.in_(author_ids)))
+        existing_authors = set(result.scalars().all())
+
+        valid_rows = []
+        for line, row in rows:
+            if row.author in existing_authors:
+                valid_rows.append((line, row))
+            else:
+                errors.append({'line': line, 'error': f'Автор с ID {row.author} не найден'})
+        if not valid_rows:
+            return [], errors
+
+        try:
+            imported = await cls._insert_import_rows(db=db, rows=valid_rows)
+        except SQLAlchemyError as e:
+            logger.warning('Пакет импорта не записан (%s), повтор по одной строке', e.__class__.__name__)
+            imported = []
+            for line, row in valid_rows:
+                try:
+                    imported += await cls._insert_import_rows(db=db, rows=[(line, row)])
+                except SQLAlchemyError as row_error:
+                    errors.append({'line': line, 'error': str(getattr(row_error, 'orig', None) or row_error)})
+        return imported, errors
+
+    @classmethod
+    async def _insert_import_rows(cls, db: AsyncSession, rows: List[tuple[int, MBlogImport]]) -> list:
+        tags_by_row = [list(dict.fromkeys(tag.strip().lower() for tag in row.tags if tag and tag.strip()))
+                       for _, row in rows]
+        async with cls.transaction(db):
+            tag_ids = await TagDAO.upsert_tags(db=db, tag_names=[name for names in tags_by_row for name in names])
+            blogs = await cls.add_many(
+                db=db,
+                data=[row.model_dump(exclude={'tags'}, exclude_none=True) for _, row in rows],
+            )
+            pairs = [
+                {'blog_id': blog.id, 'tag_id': tag_ids[name]}
+                for blog, names in zip(blogs, tags_by_row)
+                for name in names if name in tag_ids
+            ]
+            if pairs:
+                await BlogTagDAO.add_blog_tags(db=db, blog_tag_pairs=pairs)
+        return [(blog.id, blog.author, blog.status, names) for blog, names in zip(blogs, tags_by_row)]
+
+    @classmethod
+    async def search_blogs(cls, db: AsyncSession, q: str, page_size: int = 10, cursor: str = None) -> dict:
+        """
+        Метод для полнотекстового поиска по заголовку, описанию и тексту опубликованных блогов.
+        Использует колонку search_vector с GIN-индексом, результаты упорядочены по релевантности
+        (ts_rank_cd) и ID, постранично выдаются по курсору (rank, id).
+        Фрагменты с подсветкой (ts_headline) строятся только для блогов текущей страницы.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param q: Поисковый запрос в формате websearch_to_tsquery
+        :param page_size: Количество записей на странице
+        :param cursor: Курсор next_cursor из предыдущего ответа
+        :return: Словарь с результатами поиска и курсором следующей страницы
+        """
+        ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+        rank = func.ts_rank_cd(cls.model.search_vector, ts_query)
+
+        matches = (
+            select(cls.model.id.label('id'), rank.label('rank'))
+            .filter(cls.model.search_vector.op('@@')(ts_query))
+            .filter_by(status='published')
+        )
+        if cursor:
+            cursor_rank, cursor_id = decode_search_cursor(cursor)
+            matches = matches.filter(tuple_(rank, cls.model.id) < tuple_(cursor_rank, cursor_id))
+        matches = matches.order_by(rank.desc(), cls.model.id.desc()).limit(page_size + 1).subquery()
+
+        snippet = func.ts_headline(
+            literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+            cls.model.content,
+            ts_query,
+            f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=30, MinWords=10',
+        )
+        query = (
+            select(cls.model, matches.c.rank, snippet.label('snippet'))
+            .join(matches, cls.model.id == matches.c.id)
+            .options(selectinload(cls.model.tags))
+            .order_by(matches.c.rank.desc(), cls.model.id.desc())
+        )
+        rows = (await db.execute(query)).all()
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last_blog, last_rank, _ = rows[-1]
+            next_cursor = encode_search_cursor(last_rank, last_blog.id)
+
+        blogs = [
+            MBlogSearchResult(
+                id=blog.id,
+                author=blog.author,
+                title=blog.title,
+                short_description=blog.short_description,
+                created_at=blog.created_at,
+                tags=blog.tags,
+                rank=blog_rank,
+                snippet=highlight_snippet(blog_snippet),
+            )
+            for blog, blog_rank, blog_snippet in rows
+        ]
+        logger.info("Поиск '%s': найдено %s блогов на странице", q, len(blogs))
+        return {
+            'query': q,
+            'blogs': blogs,
+            'next_cursor': next_cursor,
         }
 
 
@@ -252,33 +953,31 @@ class BlogTagDAO(BaseDAO):
 
     @classmethod
     async def add_blog_tags(cls, db: AsyncSession, blog_tag_pairs: List[dict]) -> None:
-        blog_tag_instances = []
+        """
+        Метод для добавления связок блогов и тегов одним многострочным INSERT.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param blog_tag_pairs: Список словарей с ключами blog_id и tag_id
+        """
+        values = []
         for pair in blog_tag_pairs:
             blog_id = pair.get('blog_id')
             tag_id = pair.get('tag_id')
-            print(blog_id, tag_id)
             if blog_id and tag_id:
-                blog_tag = cls.model(blog_id=blog_id, tag_id=tag_id)
-                blog_tag_instances.append(blog_tag)
-                print(blog_tag)
+                values.append({'blog_id': blog_id, 'tag_id': tag_id})
             else:
-                logger.warning(f"Пропущен неверный параметр в паре: {pair}")
-        
-        print(blog_tag_instances)
-        if blog_tag_instances:
-            print(blog_tag_instances)
-            db.add_all(blog_tag_instances)
-            try:
-                await db.commit()
-                await db.flush()
-                logger.info(f"{len(blog_tag_instances)} связок блогов и тегов успешно добавлено.")
-            except SQLAlchemyError as e:
-                await db.rollback()
-                logger.info(f"Ошибка при добавлении связок блогов и тегов: {e}")
-                raise
-        else:
-            logger.warning("Нет валидных данных для добавления в таблицу blog_tags.")
+                logger.warning("Пропущен неверный параметр в паре: %s", pair)
 
-        
+        if not values:
+            logger.warning("Нет валидных данных для добавления в таблицу blog_tags.")
+            return
 
-    
\ No newline at end of file
+        try:
+            # executemany: SQLAlchemy сам разбивает большой список на многострочные INSERT
+            await db.execute(insert(cls.model), values)
+            await cls._commit(db)
+            logger.info("%s связок блогов и тегов успешно добавлено.", len(values))
+        except SQLAlchemyError as e:
+            await cls._rollback(db)
+            logger.info("Ошибка при добавлении связок блогов и тегов: %s", e)
+            raise
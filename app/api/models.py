@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import List
-from pydantic import BaseModel, ConfigDict, computed_field, Field
+from typing import List, Literal
+from pydantic import BaseModel, ConfigDict, computed_field, Field, TypeAdapter, field_validator
 
 
 class BaseModelConfig(BaseModel):
@@ -38,6 +38,78 @@ class MBlogFullResponse(BaseModelConfig):
     user: UserBase = Field(exclude=True)
 
 
+class MBlogCachedResponse(MBlogFullResponse):
+    """
+    Блог полной ленты из общего кэша ответов. user исключается из сериализации MBlogFullResponse
+    и в JSON кэша не попадает, поэтому при восстановлении он необязателен.
+    """
+    user: UserBase | None = Field(default=None, exclude=True)
+
+
+class MBlogSummary(BaseModelConfig):
+    """Краткое представление блога для лент: без содержимого и данных автора."""
+    id: int
+    author: int
+    title: str
+    short_description: str
+    created_at: datetime
+    status: str
+    tags: List[TagResponse]
+
+
+class MBlogExport(BaseModelConfig):
+    """Блог для выгрузки в NDJSON: с автором, тегами и датой изменения."""
+    id: int
+    title: str
+    content: str
+    short_description: str
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    author: int
+    user: UserBase
+    tags: List[TagResponse]
+
+
+class MBlogImport(BaseModel):
+    """
+    Строка NDJSON для импорта блога. Лишние поля игнорируются, поэтому принимается
+    и формат выгрузки /api/export (теги в виде объектов {"id": ..., "name": ...}).
+    """
+    title: str = Field(min_length=1, max_length=50)
+    content: str
+    short_description: str
+    author: int
+    status: Literal['draft', 'published'] = 'published'
+    created_at: datetime | None = None
+    tags: List[str] = []
+
+    @field_validator('tags', mode='before')
+    @classmethod
+    def tag_names(cls, value):
+        if isinstance(value, list):
+            return [tag.get('name') if isinstance(tag, dict) else tag for tag in value]
+        return value
+
+
+# Пакетная валидация списков блогов: один вызов pydantic-core вместо model_validate на каждый блог
+blog_list_adapter = TypeAdapter(List[MBlogFullResponse])
+blog_cached_list_adapter = TypeAdapter(List[MBlogCachedResponse])
+blog_summary_list_adapter = TypeAdapter(List[MBlogSummary])
+blog_export_list_adapter = TypeAdapter(List[MBlogExport])
+
+
+class MBlogSearchResult(BaseModelConfig):
+    id: int
+    author: int
+    title: str
+    short_description: str
+    created_at: datetime
+    tags: List[TagResponse]
+    rank: float
+    snippet: str
+
+
 class MBlogNotFind(BaseModelConfig):
     message: str
     status: str
\ No newline at end of file
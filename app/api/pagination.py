@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, blog_id: int, direction: str = 'next') -> str:
+    """
+    Кодирует позицию в ленте (created_at, id) в непрозрачный курсор.
+
+    :param created_at: Дата создания крайнего блога на странице.
+    :param blog_id: ID крайнего блога на странице.
+    :param direction: Направление листания ('next' или 'prev').
+    :return: Строка курсора в формате urlsafe base64.
+    """
+    raw = json.dumps({'c': created_at.isoformat(), 'i': blog_id, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int, str]:
+    """
+    Декодирует курсор, полученный от клиента.
+
+    :param cursor: Строка курсора.
+    :return: Кортеж (created_at, id, direction).
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = data.get('d', 'next')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(data['c']), int(data['i']), direction
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail='Некорректный курсор пагинации')
+
+
+def encode_search_cursor(rank: float, blog_id: int) -> str:
+    """
+    Кодирует позицию в результатах поиска (rank, id) в непрозрачный курсор.
+    """
+    raw = json.dumps({'r': rank, 'i': blog_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(data['r']), int(data['i'])
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail='Некорректный курсор пагинации')
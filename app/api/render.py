@@ -0,0 +1,43 @@
+import hashlib
+import markdown2
+from sqlalchemy import event, inspect
+from .schemas import Blog
+
+
+MARKDOWN_EXTRAS = ['fenced-code-blocks', 'tables']
+
+# Версия рендерера: меняется при обновлении markdown2 или набора extras.
+# Блоги с другой версией перерисовываются лениво при просмотре или командой backfill.
+RENDERER_VERSION = hashlib.sha1(
+    f'{markdown2.__version__}:{",".join(MARKDOWN_EXTRAS)}'.encode()
+).hexdigest()[:16]
+
+
+def render_markdown(content: str) -> str:
+    """
+    Преобразует Markdown в HTML.
+
+    :param content: Текст блога в формате Markdown.
+    :return: HTML-представление текста.
+    """
+    return markdown2.markdown(content, extras=MARKDOWN_EXTRAS)
+
+
+def is_rendered(blog) -> bool:
+    return bool(blog.content_html) and blog.content_html_version == RENDERER_VERSION
+
+
+@event.listens_for(Blog.content, 'set')
+def _mark_stale_on_content_change(target: Blog, value: str, oldvalue, initiator) -> None:
+    """
+    При изменении content через ORM сохраненный HTML перестает соответствовать тексту,
+    поэтому версия рендера сбрасывается. HTML рендерится в пуле потоков: при записи
+    в BlogDAO.add/add_many или лениво в BlogDAO.get_rendered_content.
+    Новые (еще не сохраненные) блоги пропускаются: в конструкторе content может
+    быть присвоен после content_html_version, и версия не должна сбрасываться.
+    """
+    state = inspect(target)
+    if state.transient or state.pending:
+        return
+    if value != oldvalue:
+        target.content_html_version = None
@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from app.auth.schemas import User
-from app.auth.auth import get_current_user, get_current_user_optional
+from app.auth.auth import get_current_user, get_current_user_optional, get_current_admin_user
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.db import get_session
 from .dao import *
-from sqlalchemy.exc import IdentifierError
-from .models import MBlogCreate, MBlogFullResponse, MBlogNotFind
-from .services import get_blog_info
-from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IdentifierError, SQLAlchemyError
+from .models import MBlogCreate, MBlogFullResponse, MBlogNotFind, MBlogSummary
+from .services import (get_blog_info, get_blog_validators, get_feed_validators, get_feed_page, export_blogs,
+                       import_blogs, iter_lines)
+from app.http_cache import CacheValidators
+from .tag_index import tag_index
+from fastapi.responses import JSONResponse, StreamingResponse
+from datetime import datetime
+from app.config import EXPORT_BATCH_SIZE, IMPORT_BATCH_SIZE
+from fastapi.encoders import jsonable_encoder
+from app.responses import FastJSONResponse
 
 
 router = APIRouter(prefix='/api', tags=['API'])
 
+# Поля блога, доступные для выборки через fields=
+BLOG_FIELDS = set(MBlogFullResponse.model_fields) - {'user'}
+
 
 @router.post('/add_post', summary="Добавление нового блога с тегами")
 async def add_blog(
@@ -25,18 +35,25 @@ async def add_blog(
     tags = blog_dict.pop('tags', [])
 
     try:
-        blog = await BlogDAO.add(db=db, data=blog_dict)
-        blog_id = blog.id
+        # Блог, теги и связки записываются в одной транзакции с одним commit
+        async with BlogDAO.transaction(db):
+            blog = await BlogDAO.add(db=db, data=blog_dict)
+            blog_id = blog.id
+
+            if tags:
+                tags_ids = await TagDAO.add_tags(db=db, tag_names=tags)
+                await BlogTagDAO.add_blog_tags(db=db, blog_tag_pairs=[{
+                                                                    'blog_id': blog_id,
+                                                                    'tag_id': i
+                                                                    } for i in tags_ids])
+        BlogDAO.invalidate_counts()
+        if blog.status == 'published':
+            tag_index.add_blog(blog_id, [tag.strip() for tag in tags if tag.strip()])
+            await BlogDAO.purge_feed_cache(user_data.id, tags)
 
         if tags:
-            tags_ids = await TagDAO.add_tags(db=db, tag_names=tags)
-            await BlogTagDAO.add_blog_tags(db=db, blog_tag_pairs=[{
-                                                                'blog_id': blog_id,
-                                                                'tag_id': i
-                                                                } for i in tags_ids])
-            
-
             return {'status': 'success', 'message': f'Блог с ID {blog_id} успешно добавлен с тегами.'}
+        return {'status': 'success', 'message': f'Блог с ID {blog_id} успешно добавлен.'}
     except IdentifierError as e:
         if "UNIQUE constraint failed" in str(e.orig):
             raise HTTPException(status_code=400,
@@ -48,9 +65,14 @@ async def add_blog(
 async def get_blog_endpoint(
 
     blog_id: int,
+    response: Response,
+    # Валидаторы объявлены до get_blog_info: при 304 блог не загружается
+    validators: CacheValidators | None = Depends(get_blog_validators),
     blog_info: MBlogFullResponse | MBlogNotFind = Depends(get_blog_info),
 
 ) -> MBlogFullResponse | MBlogNotFind:
+    if validators is not None and not isinstance(blog_info, dict):
+        validators.apply(response)
     return blog_info
 
 
@@ -86,14 +108,83 @@ async def change_blog_status(
 
 @router.get('/blogs', summary="Получить все блоги в статусе 'publish'")
 async def get_blogs_info(
+    validators: CacheValidators | None = Depends(get_feed_validators),
     db: AsyncSession = Depends(get_session),
     author_id: int | None = None,
     tag: str | None = None,
     page: int = Query(1, ge=1, description='Номер страницы'),
     page_size: int = Query(10, ge=10, description='Количество записей на странице'),
+    cursor: str | None = Query(None, description='Курсор next_cursor/prev_cursor для keyset-пагинации'),
+    count_mode: str | None = Query(None, pattern='^(exact|cached|estimated)$',
+                                   description='Стратегия подсчета total_result'),
+    tag_match: str | None = Query(None, pattern='^(exact|prefix|fuzzy)$',
+                                  description='Режим сравнения тега'),
+    tags: str | None = Query(None, description='Несколько тегов через запятую'),
+    mode: str = Query('all', pattern='^(all|any)$', description='all - все теги, any - хотя бы один'),
+    view: str = Query('full', pattern='^(full|summary)$',
+                      description='full - блоги с содержимым, summary - без содержимого и автора'),
+    fields: str | None = Query(None, description='Поля блога через запятую, например id,title,tags'),
 ):
     try:
-        result = await BlogDAO.get_list_blog(db=db, author_id=author_id, tag=tag, page=page, page_size=page_size)
-        return result if result['blogs'] else print('dsffdsfdsfdss')
-    except Exception as e:
-        logger.info(f'Ошибка при получении блогов: {e}')
+        include = None
+        if fields:
+            include = {field.strip() for field in fields.split(',') if field.strip()}
+            unknown = include - BLOG_FIELDS
+            if unknown:
+                raise HTTPException(status_code=400, detail=f'Неизвестные поля: {", ".join(sorted(unknown))}')
+            # content есть только в полном представлении, остальные поля дает summary
+            view = 'full' if include - set(MBlogSummary.model_fields) else 'summary'
+
+        if tags:
+            result = await BlogDAO.get_list_blog_by_tags(db=db, tags=tags.split(','), mode=mode, page=page,
+                                                         page_size=page_size, author_id=author_id)
+        else:
+            result = await get_feed_page(db=db, author_id=author_id, tag=tag, page=page, page_size=page_size,
+                                         cursor=cursor, count_mode=count_mode, tag_match=tag_match, view=view)
+
+        if include is not None:
+            result = {**result, 'blogs': [jsonable_encoder(blog, include=include) for blog in result['blogs']]}
+        # Ответ сериализуется pydantic-core напрямую, без jsonable_encoder
+        response = FastJSONResponse(result)
+        if validators is not None and not tags:
+            validators.apply(response)
+        return response
+    except SQLAlchemyError as e:
+        logger.error('Ошибка при получении блогов: %s', e)
+        raise HTTPException(status_code=500, detail='Ошибка при получении блогов.')
+
+
+
+@router.get('/search', summary="Полнотекстовый поиск по опубликованным блогам")
+async def search_blogs(
+    q: str = Query(..., min_length=1, max_length=200, description='Поисковый запрос'),
+    page_size: int = Query(10, ge=1, le=100, description='Количество записей на странице'),
+    cursor: str | None = Query(None, description='Курсор next_cursor для следующей страницы'),
+    db: AsyncSession = Depends(get_session),
+):
+    return FastJSONResponse(await BlogDAO.search_blogs(db=db, q=q, page_size=page_size, cursor=cursor))
+
+
+@router.get('/export', summary="Потоковая выгрузка опубликованных блогов в NDJSON (для администраторов)")
+async def export_blogs_endpoint(
+    updated_since: datetime | None = Query(None, description='Только блоги, измененные после этой даты'),
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000, description='Размер пакета чтения'),
+    admin: User = Depends(get_current_admin_user),
+):
+    return StreamingResponse(export_blogs(updated_since=updated_since, batch_size=batch_size),
+                             media_type='application/x-ndjson')
+
+
+@router.post('/import', summary="Импорт блогов из NDJSON (для администраторов)")
+async def import_blogs_endpoint(
+    request: Request,
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000, description='Размер пакета вставки'),
+    admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Тело запроса - NDJSON (application/x-ndjson), по одному блогу на строку:
+    {"title": ..., "content": ..., "short_description": ..., "author": 1, "status": "published", "tags": [...]}.
+    Тело читается потоком, в ответе - количество импортированных блогов и ошибки по номерам строк.
+    """
+    return await import_blogs(db=db, lines=iter_lines(request.stream()), batch_size=batch_size)
@@ -1,14 +1,28 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String, Text, UniqueConstraint
+from sqlalchemy import ForeignKey, String, Text, UniqueConstraint, Index, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from app.database.db import Base
 
 
+# Конфигурация полнотекстового поиска PostgreSQL
+SEARCH_CONFIG = 'russian'
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(NEW.title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(NEW.short_description, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(NEW.content, '')), 'C')"
+)
+
+
 class Blog(Base):
     title: Mapped[str] = mapped_column(String(50), nullable=False)
     author: Mapped[int] = mapped_column(ForeignKey('users.id'), nullable=False)
     short_description: Mapped[str] = mapped_column(Text, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     status: Mapped[str] = mapped_column(String, default='published', server_default='published')
+    content_html: Mapped[str | None] = mapped_column(Text, nullable=True)
+    content_html_version: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    # Заполняется триггером blogs_search_vector_update (см. миграцию b52f0e7a4d91)
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
     user: Mapped['User'] = relationship('User', back_populates='blogs')
     tags: Mapped[list['Tag']] = relationship(
@@ -18,6 +32,27 @@ class Blog(Base):
 
     )
 
+    __table_args__ = (
+        Index('ix_blogs_status_created_at_id', 'status', 'created_at', 'id'),
+        Index('ix_blogs_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+
+
+# Триггер search_vector для схемы, созданной через metadata.create_all (как в миграции)
+event.listen(Blog.__table__, 'after_create', DDL(f"""
+    CREATE OR REPLACE FUNCTION blogs_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_VECTOR_EXPRESSION};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+""").execute_if(dialect='postgresql'))
+event.listen(Blog.__table__, 'after_create', DDL("""
+    CREATE TRIGGER blogs_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, short_description, content ON blogs
+    FOR EACH ROW EXECUTE FUNCTION blogs_search_vector_update()
+""").execute_if(dialect='postgresql'))
+
 
 class Tag(Base):
     name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
@@ -29,6 +64,11 @@ class Tag(Base):
 
     )
 
+    __table_args__ = (
+        Index('ix_tags_name_pattern', 'name', postgresql_ops={'name': 'varchar_pattern_ops'}),
+        Index('ix_tags_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
+
 
 class BlogTag(Base):
     blog_id: Mapped[int] = mapped_column(ForeignKey('blogs.id', ondelete="CASCADE"), nullable=False)
@@ -36,4 +76,5 @@ class BlogTag(Base):
 
     __table_args__ = (
         UniqueConstraint('blog_id', 'tag_id', name='uq_blog_tag'),
+        Index('ix_blogtags_tag_id_blog_id', 'tag_id', 'blog_id'),
     )
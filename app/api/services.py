@@ -1,10 +1,23 @@
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator
+from pydantic import ValidationError
+import json
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends
+from fastapi import Depends, Request
 from app.auth.schemas import User
 from app.auth.auth import get_current_user_optional
-from .models import MBlogFullResponse, MBlogNotFind
+from .models import (MBlogFullResponse, MBlogNotFind, MBlogImport, blog_cached_list_adapter,
+                     blog_summary_list_adapter)
+from .tag_index import tag_index
 from .dao import BlogDAO
-from app.database.db import get_session
+from app.database.db import get_session, release_connection, AsyncSession as async_session_maker
+from app.singleflight import SingleFlight
+from app.logger import logger
+from app.http_cache import (CacheValidators, make_etag, raise_if_not_modified, PUBLIC_REVALIDATE,
+                            PRIVATE_REVALIDATE)
+from .render import RENDERER_VERSION
+from app.response_cache import response_cache
+from app.config import EXPORT_BATCH_SIZE, IMPORT_BATCH_SIZE
 
 
 async def get_blog_info(
@@ -19,4 +32,269 @@ async def get_blog_info(
     Если блог не найден или доступ к нему не предоставлен, возвращается соответствующее сообщение.
     """
     author_id = user_data.id if user_data else None
-    return await BlogDAO.get_full_blog_info(db=db, blog_id=blog_id, author_id=author_id)
\ No newline at end of file
+    return await BlogDAO.get_full_blog_info(db=db, blog_id=blog_id, author_id=author_id)
+
+
+blog_page_flight = SingleFlight()
+
+
+async def load_blog_page(blog_id: int, author_id: int = None) -> dict | None:
+    """
+    Загружает блог для HTML-страницы вместе с отрендеренным содержимым.
+    Выполняется в собственной сессии, так как результат разделяется между запросами
+    в blog_page_flight. Возвращает None, если блог не найден или недоступен.
+    """
+    async with async_session_maker() as db:
+        blog = await BlogDAO.get_full_blog_info(db=db, blog_id=blog_id, author_id=author_id)
+        if isinstance(blog, dict):
+            return None
+        article = MBlogFullResponse.model_validate(blog).model_dump()
+        # HTML рендерится при записи блога, здесь используется сохраненная версия
+        article['content'] = await BlogDAO.get_rendered_content(db=db, blog=blog)
+        return article
+
+
+async def get_blog_page(
+
+        blog_id: int,
+        db: AsyncSession = Depends(get_session),
+        user_data: User | None = Depends(get_current_user_optional),
+
+) -> dict | None:
+    """
+    Данные для страницы /blogs/{blog_id}/ с объединением конкурентных загрузок.
+    Опубликованный блог одинаков для всех, поэтому загружается одной общей задачей с ключом
+    (blog_id, 'public'). Черновик виден только автору и загружается с ключом автора.
+    На время ожидания соединение запроса возвращается в пул, иначе при всплеске
+    ожидающие запросы заняли бы весь пул и общая загрузка не получила бы соединение.
+    """
+    await release_connection(db)
+    article = await blog_page_flight.do((blog_id, 'public'), lambda: load_blog_page(blog_id))
+    if article is None and user_data is not None:
+        author_id = user_data.id
+        article = await blog_page_flight.do((blog_id, f'user:{author_id}'),
+                                            lambda: load_blog_page(blog_id, author_id=author_id))
+    return article
+
+
+async def get_blog_validators(
+
+        blog_id: int,
+        request: Request,
+        db: AsyncSession = Depends(get_session),
+        user_data: User | None = Depends(get_current_user_optional),
+
+) -> CacheValidators | None:
+    """
+    Валидаторы условного GET для /api/get_blog/{blog_id}.
+    Выполняет только легкий запрос updated_at и, если клиентская копия актуальна,
+    отвечает 304 до загрузки блога. Черновики отдаются только автору с Cache-Control: private.
+    """
+    row = await BlogDAO.get_blog_validator(db=db, blog_id=blog_id)
+    if row is None:
+        return None
+
+    viewer_id = user_data.id if user_data else None
+    if row.status == 'draft':
+        if viewer_id != row.author:
+            return None
+        validators = CacheValidators(make_etag('blog', blog_id, row.updated_at.isoformat(), viewer_id),
+                                     row.updated_at, PRIVATE_REVALIDATE, vary='Cookie')
+    else:
+        validators = CacheValidators(make_etag('blog', blog_id, row.updated_at.isoformat()),
+                                     row.updated_at, PUBLIC_REVALIDATE)
+    return raise_if_not_modified(request, validators)
+
+
+async def get_blog_page_validators(
+
+        blog_id: int,
+        request: Request,
+        db: AsyncSession = Depends(get_session),
+        user_data: User | None = Depends(get_current_user_optional),
+
+) -> CacheValidators | None:
+    """
+    Валидаторы условного GET для HTML-страницы блога. Страница зависит от пользователя
+    (кнопки автора) и от версии рендерера Markdown, поэтому они входят в ETag,
+    а ответ помечается как private с Vary: Cookie.
+    """
+    row = await BlogDAO.get_blog_validator(db=db, blog_id=blog_id)
+    if row is None:
+        return None
+
+    viewer_id = user_data.id if user_data else None
+    if row.status == 'draft' and viewer_id != row.author:
+        return None
+
+    validators = CacheValidators(
+        make_etag('blog-page', blog_id, row.updated_at.isoformat(), RENDERER_VERSION, viewer_id),
+        row.updated_at, PRIVATE_REVALIDATE, vary='Cookie',
+    )
+    return raise_if_not_modified(request, validators)
+
+
+def feed_validators(default_page_size: int):
+    """
+    Зависимость с валидаторами условного GET для ленты блогов (/api/blogs, /blogs/).
+    ETag строится из параметров запроса, пар (id, updated_at) блогов выбранной страницы и версии
+    ленты BlogDAO.feed_changed_at: запрос читает только строки страницы и не считает всю ленту.
+    Версия меняется при любом добавлении, удалении и смене статуса блога, поэтому total_result
+    и total_page в закэшированной клиентом странице не устаревают, даже если строки страницы
+    остались прежними. Last-Modified - максимум из updated_at строк и версии ленты.
+    Версия ведется в процессе, как и in-memory кэши.
+    Для поиска и фильтра по нескольким тегам валидаторы не вычисляются.
+
+    :param default_page_size: Размер страницы по умолчанию у обработчика ленты
+    """
+
+    async def get_validators(
+
+            request: Request,
+            author_id: int | None = None,
+            tag: str | None = None,
+            tag_match: str | None = None,
+            page: int = 1,
+            page_size: int = default_page_size,
+            cursor: str | None = None,
+            db: AsyncSession = Depends(get_session),
+
+    ) -> CacheValidators | None:
+        if request.query_params.get('q') or request.query_params.get('tags') or page < 1 or page_size < 1:
+            return None
+
+        rows = await BlogDAO.get_page_validator(db=db, author_id=author_id, tag=tag, page=page,
+                                                page_size=page_size, cursor=cursor, tag_match=tag_match)
+        if not rows:
+            return None
+
+        feed_changed_at = BlogDAO.feed_changed_at
+        validators = CacheValidators(
+            make_etag('feed', request.url.path, str(request.query_params), feed_changed_at.isoformat(),
+                      ','.join(f'{row.id}@{row.updated_at.isoformat()}' for row in rows)),
+            max(feed_changed_at, *(row.updated_at for row in rows)), PUBLIC_REVALIDATE,
+        )
+        return raise_if_not_modified(request, validators)
+
+    return get_validators
+
+
+get_feed_validators = feed_validators(default_page_size=10)
+
+
+def restore_feed_page(key: str, cached: dict | None, view: str) -> dict | None:
+    """
+    Восстанавливает страницу ленты из кэша ответов. Redis-бэкенд возвращает JSON, поэтому блоги
+    заново валидируются в модели представления view (шаблону нужен datetime). Полные блоги
+    восстанавливаются в MBlogCachedResponse: автора (user) в JSON нет, в ответ API он не выводится.
+    Запись, которая не разбирается в модели (поврежденная или старого формата), считается промахом.
+    """
+    if cached is None:
+        return None
+    try:
+        blogs = cached['blogs']
+        if blogs and isinstance(blogs[0], dict):
+            adapter = blog_summary_list_adapter if view == 'summary' else blog_cached_list_adapter
+            cached = {**cached, 'blogs': adapter.validate_python(blogs)}
+        return cached
+    except (ValidationError, KeyError, TypeError) as e:
+        logger.warning('Запись кэша ответов %s не восстановлена, читаем из БД: %s', key, e)
+        return None
+
+
+async def get_feed_page(db: AsyncSession, author_id: int = None, tag: str = None, page: int = 1,
+                        page_size: int = 10, cursor: str = None, count_mode: str = None,
+                        tag_match: str = None, view: str = 'full') -> dict:
+    """
+    Страница ленты опубликованных блогов через общий кэш ответов.
+    Лента одинакова для всех посетителей, поэтому результат BlogDAO.get_list_blog кэшируется
+    по параметрам запроса и помечается тегами автора и тега для инвалидации при записи.
+    """
+    if response_cache is None:
+        return await BlogDAO.get_list_blog(db=db, author_id=author_id, tag=tag, page=page, page_size=page_size,
+                                           cursor=cursor, count_mode=count_mode, tag_match=tag_match, view=view)
+
+    key = 'feed:' + json.dumps([author_id, tag, tag_match, page, page_size, cursor, count_mode, view],
+                               separators=(',', ':'), ensure_ascii=False)
+    cached = restore_feed_page(key, await response_cache.get(key), view)
+    if cached is not None:
+        return cached
+
+    result = await BlogDAO.get_list_blog(db=db, author_id=author_id, tag=tag, page=page, page_size=page_size,
+                                         cursor=cursor, count_mode=count_mode, tag_match=tag_match, view=view)
+    await response_cache.set(key, result, tags=BlogDAO.feed_cache_tags(author_id, tag, tag_match))
+    return result
+
+
+async def export_blogs(updated_since: datetime = None, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    Выгрузка блогов в NDJSON в собственной сессии: StreamingResponse читает генератор
+    после выхода из зависимостей запроса, поэтому сессия запроса для этого не подходит.
+    """
+    async with async_session_maker() as db:
+        async for chunk in BlogDAO.stream_export(db=db, updated_since=updated_since, batch_size=batch_size):
+            yield chunk
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Разбивает поток байтов (например, request.stream()) на строки."""
+    buffer = b''
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return '; '.join(f"{'.'.join(map(str, item['loc'])) or 'line'}: {item['msg']}" for item in error.errors())
+
+
+async def import_blogs(db: AsyncSession, lines: AsyncIterable[bytes | str],
+                       batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """
+    Импорт блогов из NDJSON пакетами по batch_size (см. BlogDAO.import_blogs).
+    Некорректные строки не прерывают импорт и возвращаются в отчете с номером строки.
+    После импорта сбрасываются кэши ленты и обновляется индекс тегов.
+    """
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    imported = []
+    batch = []
+
+    async def flush() -> None:
+        batch_imported, batch_errors = await BlogDAO.import_blogs(db=db, rows=batch)
+        imported.extend(batch_imported)
+        report['errors'].extend(batch_errors)
+        logger.info('Импортирован пакет: %s блогов, ошибок: %s', len(batch_imported), len(batch_errors))
+        batch.clear()
+
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            batch.append((line_number, MBlogImport.model_validate_json(line)))
+        except ValidationError as e:
+            report['errors'].append({'line': line_number, 'error': format_validation_error(e)})
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    if imported:
+        BlogDAO.invalidate_counts()
+        tags_by_author: dict[int, set[str]] = {}
+        for blog_id, author_id, status, tag_names in imported:
+            if status == 'published':
+                tag_index.add_blog(blog_id, tag_names)
+                tags_by_author.setdefault(author_id, set()).update(tag_names)
+        for author_id, tag_names in tags_by_author.items():
+            await BlogDAO.purge_feed_cache(author_id, list(tag_names))
+
+    report['imported'] = len(imported)
+    report['errors'].sort(key=lambda error: error['line'])
+    report['failed'] = len(report['errors'])
+    return report
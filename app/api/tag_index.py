@@ -0,0 +1,119 @@
+import sys
+from array import array
+from bisect import bisect_left, insort
+from heapq import merge
+from typing import Iterable, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.logger import logger
+from .schemas import Blog, Tag, BlogTag
+
+
+class TagIndex:
+    """
+    In-memory инвертированный индекс: имя тега -> отсортированный массив ID опубликованных блогов.
+    Массивы array('I') хранят ID компактно (4 байта на запись), пересечение и объединение
+    нескольких тегов выполняются без обращения к PostgreSQL.
+
+    Индекс локален для процесса: изменения из других воркеров подхватываются периодической
+    перестройкой (TAG_INDEX_REFRESH_SECONDS).
+    """
+
+    def __init__(self):
+        self.postings: dict[str, array] = {}
+        self.ready = False
+
+    async def build(self, db: AsyncSession, batch_size: int = 10000) -> None:
+        """
+        Строит индекс по таблице blogtags для опубликованных блогов.
+        """
+        query = (
+            select(Tag.name, BlogTag.blog_id)
+            .join(Tag, Tag.id == BlogTag.tag_id)
+            .join(Blog, Blog.id == BlogTag.blog_id)
+            .where(Blog.status == 'published')
+            .order_by(Tag.name, BlogTag.blog_id)
+            .execution_options(yield_per=batch_size)
+        )
+        postings: dict[str, array] = {}
+        result = await db.stream(query)
+        async for name, blog_id in result:
+            name = name.lower()
+            posting = postings.get(name)
+            if posting is None:
+                posting = postings[name] = array('I')
+            if not posting or posting[-1] < blog_id:
+                posting.append(blog_id)
+            elif not _contains(posting, blog_id):
+                # Имена тегов в разном регистре сливаются в один список
+                insort(posting, blog_id)
+
+        self.postings = postings
+        self.ready = True
+        logger.info('Индекс тегов построен: %s тегов, %s байт', len(postings), self.memory_usage()["bytes_total"])
+
+    def add_blog(self, blog_id: int, tag_names: Iterable[str]) -> None:
+        if not self.ready:
+            return
+        for name in tag_names:
+            posting = self.postings.setdefault(name.lower(), array('I'))
+            position = bisect_left(posting, blog_id)
+            if position == len(posting) or posting[position] != blog_id:
+                posting.insert(position, blog_id)
+
+    def remove_blog(self, blog_id: int) -> None:
+        if not self.ready:
+            return
+        for name in list(self.postings):
+            posting = self.postings[name]
+            position = bisect_left(posting, blog_id)
+            if position < len(posting) and posting[position] == blog_id:
+                del posting[position]
+                if not posting:
+                    del self.postings[name]
+
+    def query(self, tag_names: List[str], mode: str = 'all') -> List[int]:
+        """
+        Возвращает ID блогов по тегам в порядке убывания ID (от новых к старым).
+
+        :param tag_names: Список тегов
+        :param mode: all - блоги со всеми тегами, any - хотя бы с одним
+        """
+        postings = [self.postings.get(name.lower(), array('I')) for name in dict.fromkeys(tag_names)]
+        if not postings:
+            return []
+
+        if mode == 'any':
+            ids = []
+            for blog_id in merge(*postings):
+                if not ids or ids[-1] != blog_id:
+                    ids.append(blog_id)
+        else:
+            postings.sort(key=len)
+            smallest, others = postings[0], postings[1:]
+            ids = [blog_id for blog_id in smallest if all(_contains(posting, blog_id) for posting in others)]
+
+        ids.reverse()
+        return ids
+
+    def memory_usage(self) -> dict:
+        arrays_bytes = sum(sys.getsizeof(posting) for posting in self.postings.values())
+        keys_bytes = sum(sys.getsizeof(name) for name in self.postings)
+        dict_bytes = sys.getsizeof(self.postings)
+        return {
+            'ready': self.ready,
+            'tags': len(self.postings),
+            'postings': sum(len(posting) for posting in self.postings.values()),
+            'bytes_arrays': arrays_bytes,
+            'bytes_keys': keys_bytes,
+            'bytes_dict': dict_bytes,
+            'bytes_total': arrays_bytes + keys_bytes + dict_bytes,
+        }
+
+
+def _contains(posting: array, blog_id: int) -> bool:
+    position = bisect_left(posting, blog_id)
+    return position < len(posting) and posting[position] == blog_id
+
+
+tag_index = TagIndex()
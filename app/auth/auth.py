@@ -1,16 +1,23 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
-from app.config import ALGORITHM, get_auth_data, SECRET_KEY
+from app.config import (ALGORITHM, get_auth_data, SECRET_KEY, BCRYPT_ROUNDS, PASSWORD_HASH_EXECUTOR,
+                        PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT, AUTH_MODE,
+                        ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS)
 from pydantic import EmailStr
 from .dao import UserDAO
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Response, Request, HTTPException, Depends
 from app.database.db import get_session
+from app.logger import logger
 from .schemas import User
+from .models import MTokenUser
+from .cache import user_cache, token_cache, user_cache_enabled
 
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated="auto")
+pwd_context = CryptContext(schemes=['bcrypt'], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 
 def get_password_hash(password: str) -> str:
@@ -21,21 +28,114 @@ def get_verify_password(plain_password: str, hashed_password: str) -> str:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_access_token(data: dict) -> bool:
+def get_verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Проверяет пароль и, если хеш создан с другим BCRYPT_ROUNDS, возвращает новый хеш.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherPool:
+    """
+    Ограниченный пул для bcrypt, чтобы хеширование не блокировало event loop.
+    Одновременно выполняется не больше workers операций, еще queue_limit могут ждать
+    в очереди; при переполнении сразу возвращается 503.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, kind: str = 'thread'):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.kind = kind
+        self.in_flight = 0
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.in_flight >= self.workers + self.queue_limit:
+            logger.warning('Пул хеширования паролей переполнен: %s операций в работе', self.in_flight)
+            raise HTTPException(status_code=503, detail='Сервер перегружен, попробуйте позже',
+                                headers={'Retry-After': '1'})
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(
+    workers=PASSWORD_HASH_WORKERS,
+    queue_limit=PASSWORD_HASH_QUEUE_LIMIT,
+    kind=PASSWORD_HASH_EXECUTOR,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return await password_hasher.run(get_verify_and_update_password, plain_password, hashed_password)
+
+
+def get_access_token(data: dict, expires_delta: timedelta | None = None) -> bool:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=30)
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({'exp': expire})
     auth_data = get_auth_data()
     encode_jwt = jwt.encode(to_encode, auth_data['secret_key'], algorithm=auth_data['algorithm'])
     return encode_jwt
 
 
+def create_access_token(user: User) -> str:
+    """
+    Создает короткоживущий access-токен с данными, достаточными для
+    восстановления пользователя без обращения к БД (режим AUTH_MODE=stateless).
+    """
+    return get_access_token({
+        'sub': str(user.id),
+        'type': 'access',
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user.roles.name if user.roles else None,
+        'ver': user.token_version or 0,
+    })
+
+
+def create_refresh_token(user: User) -> str:
+    return get_access_token(
+        {'sub': str(user.id), 'type': 'refresh', 'ver': user.token_version or 0},
+        expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
 async def auth_user(email: EmailStr, password: str, db: AsyncSession):
     user_data = {'email': email}
     user = await UserDAO.find_one_or_none(filters=user_data, db=db)
-    if user and get_verify_password(password, user.password_hash):
-        return user
-    return None
+    if not user:
+        return None
+
+    is_valid, new_hash = await verify_password(password, user.password_hash)
+    if not is_valid:
+        return None
+
+    if new_hash:
+        # Хеш создан с устаревшим BCRYPT_ROUNDS, прозрачно перехешируем при входе
+        await UserDAO.update_password_hash(db=db, user=user, password_hash=new_hash)
+    return user
 
 
 def get_token(request: Request) -> str | None:
@@ -43,15 +143,69 @@ def get_token(request: Request) -> str | None:
     return token
 
 
+def decode_token(token: str) -> dict:
+    """
+    Декодирует JWT, результат кэшируется по строке токена, поэтому при нескольких
+    зависимостях авторизации на одном маршруте jwt.decode выполняется один раз.
+    Срок действия проверяется вызывающим кодом при каждом обращении.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        auth_data = get_auth_data()
+        payload = jwt.decode(token, auth_data['secret_key'], algorithms=[auth_data['algorithm']])
+        token_cache.set(token, payload)
+    return payload
+
+
 def docode(token: str, auth_data: dict) -> dict:
     try:
-        payload = jwt.decode(token, auth_data['secret_key'], algorithms=[auth_data['algorithm']])
+        payload = decode_token(token)
     except JWTError:
         raise HTTPException(status_code=401, detail='Токен не валидный!')   
     return payload
 
 
+async def get_user_from_payload(payload: dict, db: AsyncSession) -> User | MTokenUser | None:
+    """
+    Восстанавливает пользователя по claims access-токена.
+    В режиме stateless пользователь собирается из claims без запроса к БД,
+    иначе загружается из БД (через кэш user_cache) и сверяется версия токенов.
+    """
+    if payload.get('type', 'access') != 'access':
+        return None
+
+    user_id = payload.get('sub')
+    if not user_id:
+        return None
+
+    if AUTH_MODE == 'stateless' and 'ver' in payload and 'first_name' in payload:
+        return MTokenUser(
+            id=int(user_id),
+            first_name=payload['first_name'],
+            last_name=payload['last_name'],
+            role=payload.get('role'),
+            token_version=payload['ver'],
+        )
+
+    if user_cache_enabled():
+        user = user_cache.get(int(user_id))
+        if user is None:
+            db_user = await UserDAO.find_one_or_none_by_id(data_id=int(user_id), db=db)
+            if not db_user:
+                return None
+            user = MTokenUser.from_user(db_user)
+            user_cache.set(user.id, user)
+    else:
+        user = await UserDAO.find_one_or_none_by_id(data_id=int(user_id), db=db)
+
+    if user and 'ver' in payload and payload['ver'] != user.token_version:
+        return None
+    return user
+
+
 async def get_current_user(db: AsyncSession = Depends(get_session), token: str = Depends(get_token)):
+    if not token:
+        raise HTTPException(status_code=401, detail='Токен не найден')
     auth_data = get_auth_data()
     payload = docode(token, auth_data)
     
@@ -59,12 +213,8 @@ async def get_current_user(db: AsyncSession = Depends(get_session), token: str =
     expire_time = datetime.fromtimestamp(int(expire), tz=timezone.utc)
     if (not expire) or (expire_time < datetime.now(timezone.utc)):
         raise HTTPException(status_code=401, detail='Токен истек')
-    
-    user_id = payload.get('sub')
-    if not user_id:
-        raise HTTPException(status_code=401, detail='Пользователь не найден')
 
-    user = await UserDAO.find_one_or_none_by_id(data_id=int(user_id), db=db)
+    user = await get_user_from_payload(payload, db)
     if not user:
         raise HTTPException(status_code=401, detail='Пользователь не найден')
 
@@ -87,7 +237,7 @@ async def get_current_user_optional(
         return None
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, ALGORITHM)
+        payload = decode_token(token)
     except JWTError:
         return None
     
@@ -95,10 +245,23 @@ async def get_current_user_optional(
     expire_time = datetime.fromtimestamp(int(expire), tz=timezone.utc)
     if (not expire) or (expire_time < datetime.now(timezone.utc)):
         return None
-    
-    user_id: str = payload.get('sub')
-    if not user_id:
-        return None
-    
-    user = await UserDAO.find_one_or_none_by_id(data_id=int(user_id), db=session)
-    return user
\ No newline at end of file
+
+    return await get_user_from_payload(payload, session)
+
+
+async def refresh_user_tokens(refresh_token: str | None, db: AsyncSession) -> User:
+    """
+    Проверяет refresh-токен и версию токенов пользователя в БД.
+    Возвращает пользователя, для которого можно выпустить новую пару токенов.
+    """
+    if not refresh_token:
+        raise HTTPException(status_code=401, detail='Refresh-токен не передан')
+
+    payload = docode(refresh_token, get_auth_data())
+    if payload.get('type') != 'refresh' or not payload.get('sub'):
+        raise HTTPException(status_code=401, detail='Токен не валидный!')
+
+    user = await UserDAO.find_one_or_none_by_id(data_id=int(payload['sub']), db=db)
+    if not user or payload.get('ver') != user.token_version:
+        raise HTTPException(status_code=401, detail='Токен отозван')
+    return user
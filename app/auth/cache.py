@@ -0,0 +1,26 @@
+from app.cache import TTLCache
+from app.config import AUTH_USER_CACHE_TTL, AUTH_USER_CACHE_SIZE, AUTH_TOKEN_CACHE_TTL, AUTH_TOKEN_CACHE_SIZE
+
+
+# user_id -> MTokenUser, используется в режиме AUTH_MODE=db вместо запроса к users на каждый запрос
+user_cache = TTLCache(maxsize=AUTH_USER_CACHE_SIZE, ttl=AUTH_USER_CACHE_TTL)
+# JWT -> декодированный payload
+token_cache = TTLCache(maxsize=AUTH_TOKEN_CACHE_SIZE, ttl=AUTH_TOKEN_CACHE_TTL)
+
+
+def user_cache_enabled() -> bool:
+    return AUTH_USER_CACHE_TTL > 0
+
+
+def invalidate_user(user_id: int) -> None:
+    """Сбрасывает закэшированного пользователя, вызывается при изменении пользователя."""
+    user_cache.invalidate(user_id)
+
+
+def invalidate_all_users() -> None:
+    """Сбрасывает кэш пользователей целиком, вызывается при изменении ролей."""
+    user_cache.clear()
+
+
+def get_auth_cache_stats() -> dict:
+    return {'users': user_cache.stats(), 'tokens': token_cache.stats()}
@@ -1,10 +1,86 @@
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
 from app.base_dao import BaseDAO
+from app.logger import dao_logger as logger
+from .cache import invalidate_user, invalidate_all_users
 from .schemas import User, Role
 
 
 class UserDAO(BaseDAO):
     model = User
 
+    @classmethod
+    async def update(cls, filters, data, db: AsyncSession):
+        rowcount = await super().update(filters=filters, data=data, db=db)
+        invalidate_all_users()
+        return rowcount
+
+    @classmethod
+    async def delete(cls, filters, db: AsyncSession):
+        rowcount = await super().delete(filters=filters, db=db)
+        invalidate_all_users()
+        return rowcount
+
+    @classmethod
+    async def update_password_hash(cls, db: AsyncSession, user: User, password_hash: str) -> None:
+        """
+        Метод для замены хеша пароля пользователя (например, при смене BCRYPT_ROUNDS).
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param user: Пользователь
+        :param password_hash: Новый хеш пароля
+        """
+        try:
+            user.password_hash = password_hash
+            await cls._commit(db)
+            invalidate_user(user.id)
+            logger.info('Хеш пароля пользователя с ID %s обновлен.', user.id)
+        except SQLAlchemyError as e:
+            await cls._rollback(db)
+            logger.error('Ошибка при обновлении хеша пароля пользователя с ID %s: %s', user.id, e)
+            raise
+
+    @classmethod
+    async def bump_token_version(cls, db: AsyncSession, user_id: int) -> int:
+        """
+        Метод для отзыва всех выданных пользователю токенов.
+        Увеличивает token_version: refresh-токены со старой версией перестают приниматься,
+        а в режиме db перестают приниматься и access-токены.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param user_id: ID пользователя
+        :return: Новая версия токенов
+        """
+        try:
+            result = await db.execute(
+                update(cls.model)
+                .where(cls.model.id == user_id)
+                .values(token_version=cls.model.token_version + 1)
+                .returning(cls.model.token_version)
+            )
+            token_version = result.scalar_one()
+            await cls._commit(db)
+            invalidate_user(user_id)
+            logger.info('Токены пользователя с ID %s отозваны, версия: %s', user_id, token_version)
+            return token_version
+        except SQLAlchemyError as e:
+            await cls._rollback(db)
+            logger.error('Ошибка при отзыве токенов пользователя с ID %s: %s', user_id, e)
+            raise
+
 
 class RoleDAO(BaseDAO):
-    model = Role
\ No newline at end of file
+    model = Role
+
+    @classmethod
+    async def update(cls, filters, data, db: AsyncSession):
+        rowcount = await super().update(filters=filters, data=data, db=db)
+        invalidate_all_users()
+        return rowcount
+
+    @classmethod
+    async def delete(cls, filters, db: AsyncSession):
+        rowcount = await super().delete(filters=filters, db=db)
+        invalidate_all_users()
+        return rowcount
@@ -13,3 +13,29 @@ class MUserRegister(BaseModel):
 class MUserAuth(BaseModel):
     email: EmailStr = Field(..., description='Email address')
     password_hash: str = Field(..., min_length=5, max_length=50, description='passworrd 5 < n < 50')
+
+
+class MTokenUser(BaseModel):
+    """
+    Пользователь, восстановленный из claims access-токена без обращения к БД.
+    Повторяет поля User, которые используются обработчиками.
+    """
+    id: int
+    first_name: str
+    last_name: str
+    role: str | None = None
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user) -> 'MTokenUser':
+        return cls(
+            id=user.id,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            role=user.roles.name if user.roles else None,
+            token_version=user.token_version or 0,
+        )
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == 'admin'
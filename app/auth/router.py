@@ -1,11 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.database.db import get_session
-from .models import MUserRegister, MUserAuth
+from .models import MUserRegister, MUserAuth, MTokenUser
 from .dao import UserDAO
-from .auth import get_password_hash, auth_user, get_access_token, get_current_user, get_current_user_optional
+from .auth import (hash_password, auth_user, create_access_token, create_refresh_token, refresh_user_tokens,
+                   get_current_user, get_current_user_optional)
 from fastapi import Response
 from .schemas import User
+from app.config import AUTH_MODE
 
 
 router = APIRouter(prefix='/auth', tags=['AUTH'])
@@ -13,11 +15,11 @@ router = APIRouter(prefix='/auth', tags=['AUTH'])
 
 @router.post('/register')
 async def register_user(user_data: MUserRegister, db: AsyncSession = Depends(get_session)) -> dict:
-    user = await UserDAO.find_one_or_none(filters=user_data, db=db)
+    user = await UserDAO.find_one_or_none(filters={'email': user_data.email}, db=db)
     if user:
         raise HTTPException(status_code=409, detail='Пользователь с такими данными уже существует')
     user_dict = user_data.model_dump()
-    user_dict['password_hash'] = get_password_hash(user_data.password_hash)
+    user_dict['password_hash'] = await hash_password(user_data.password_hash)
     await UserDAO.add(user_dict, db=db)
     return {'message': f'Вы успешно зарегистрированы!'}
 
@@ -27,17 +29,43 @@ async def login(response: Response, user_data: MUserAuth, db: AsyncSession = Dep
     check = await auth_user(email=user_data.email, password=user_data.password_hash, db=db)
     if check is None:
         raise HTTPException(status_code=401, detail='Неверная почта или пароль')
-    access_token = get_access_token({'sub': str(check.id)})
+    return set_auth_cookies(response, check)
+
+
+def set_auth_cookies(response: Response, user: User) -> dict:
+    access_token = create_access_token(user)
+    refresh_token = create_refresh_token(user)
     response.set_cookie(key='user_access_token', value=access_token, httponly=True)
-    return {'access_token': access_token, 'refresh_token': None}
+    response.set_cookie(key='user_refresh_token', value=refresh_token, httponly=True, path='/auth')
+    return {'access_token': access_token, 'refresh_token': refresh_token}
+
+
+@router.post('/refresh')
+async def refresh(request: Request, response: Response, db: AsyncSession = Depends(get_session)) -> dict:
+    user = await refresh_user_tokens(request.cookies.get('user_refresh_token'), db=db)
+    return set_auth_cookies(response, user)
+
+
+@router.post('/revoke')
+async def revoke_tokens(response: Response, user_data: User = Depends(get_current_user),
+                        db: AsyncSession = Depends(get_session)) -> dict:
+    await UserDAO.bump_token_version(db=db, user_id=user_data.id)
+    response.delete_cookie(key='user_access_token')
+    response.delete_cookie(key='user_refresh_token', path='/auth')
+    return {'message': 'Все токены пользователя отозваны'}
 
 
 @router.get('/me')
-async def get_me(user_data: User = Depends(get_current_user_optional)):
+async def get_me(user_data: User = Depends(get_current_user_optional), db: AsyncSession = Depends(get_session)):
+    # Из кэша пользователей приходит MTokenUser только с полями для авторизации,
+    # а /me в режиме db отдает пользователя из БД целиком
+    if isinstance(user_data, MTokenUser) and AUTH_MODE == 'db':
+        return await UserDAO.find_one_or_none_by_id(data_id=user_data.id, db=db)
     return user_data
 
 
 @router.post("/logout/")
 async def logout_user(response: Response):
     response.delete_cookie(key="user_access_token")
+    response.delete_cookie(key="user_refresh_token", path='/auth')
     return {'message': 'Пользователь успешно вышел из системы'}
\ No newline at end of file
@@ -17,9 +17,10 @@ class User(Base):
     last_name: Mapped[str]
     
     role_id: Mapped[int] = mapped_column(ForeignKey('roles.id'), default=1, server_default=text('1'))
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default=text('0'))
     roles: Mapped['Role'] = relationship('Role', back_populates='users', lazy='joined')
     blogs: Mapped[list['Blog']] = relationship(back_populates='user')
 
     @property
     def is_admin(self) -> bool:
-        return self.role.name == 'admin'
\ No newline at end of file
+        return self.roles is not None and self.roles.name == 'admin'
\ No newline at end of file
@@ -1,7 +1,9 @@
+from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Generic, TypeVar, List, Any
+from typing import Generic, TypeVar, List, Any, AsyncIterator
 from .database.db import Base
-from .logger import logger
+from .logger import dao_logger as logger
+from .metrics import instrument_dao
 from sqlalchemy import select, update, delete, func
 from sqlalchemy.exc import SQLAlchemyError
 from pydantic import BaseModel
@@ -11,41 +13,98 @@ from fastapi import HTTPException
 T = TypeVar('T', bound=Base)
 
 
+UNIT_OF_WORK_KEY = 'unit_of_work_depth'
+
+
 class BaseDAO(Generic[T]):
     model: type[T]
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Запросы к БД помечаются именем метода DAO (метрики db_queries_total и db_query_duration_seconds)
+        instrument_dao(cls)
+
+
+    @classmethod
+    @asynccontextmanager
+    async def transaction(cls, db: AsyncSession) -> AsyncIterator[AsyncSession]:
+        """
+        Единица работы (unit of work) поверх сессии.
+        Пока контекст открыт, методы DAO только выполняют flush и не фиксируют транзакцию,
+        поэтому все изменения внутри блока попадают в одну транзакцию с одним commit при выходе.
+        При исключении транзакция откатывается целиком. Вложенные вызовы присоединяются к внешнему.
+
+        Пример:
+            async with BaseDAO.transaction(db):
+                blog = await BlogDAO.add(data=..., db=db)
+                await TagDAO.add_tags(db=db, tag_names=...)
+        """
+        depth = db.info.get(UNIT_OF_WORK_KEY, 0)
+        db.info[UNIT_OF_WORK_KEY] = depth + 1
+        try:
+            yield db
+            if depth == 0:
+                await db.commit()
+        except BaseException:
+            if depth == 0:
+                # Счетчик вложенности еще не сброшен, поэтому откат выполняется напрямую, а не через _rollback
+                await db.rollback()
+            raise
+        finally:
+            db.info[UNIT_OF_WORK_KEY] = depth
+
+
+    @classmethod
+    def in_transaction(cls, db: AsyncSession) -> bool:
+        return db.info.get(UNIT_OF_WORK_KEY, 0) > 0
+
+
+    @classmethod
+    async def _commit(cls, db: AsyncSession) -> None:
+        """Фиксирует изменения или, внутри transaction(), только отправляет их в БД."""
+        await db.flush()
+        if not cls.in_transaction(db):
+            await db.commit()
+
+
+    @classmethod
+    async def _rollback(cls, db: AsyncSession) -> None:
+        """Откатывает транзакцию, если она не принадлежит внешней единице работы."""
+        if not cls.in_transaction(db):
+            await db.rollback()
+
 
     @classmethod
     async def find_one_or_none_by_id(cls, data_id: int, db: AsyncSession):
-        logger.info(f'Поиск {cls.model.__name__} с ID: {data_id}')
+        logger.info('Поиск %s с ID: %s', cls.model.__name__, data_id)
         try:
             query = select(cls.model).filter_by(id=data_id)
             result = await db.execute(query)
             record = result.scalar_one_or_none()
             if record:
-                logger.info(f'Найден {cls.model.__name__} с ID: {data_id}')
+                logger.info('Найден %s с ID: %s', cls.model.__name__, data_id)
             else:
-                logger.info(f'Не найден {cls.model.__name__} с ID: {data_id}')
+                logger.info('Не найден %s с ID: %s', cls.model.__name__, data_id)
             return record
         except SQLAlchemyError as e:
-            logger.error(f'Ошибка при поиске {cls.model.__name__} с ID: {data_id}. Error: {e}')
+            logger.error('Ошибка при поиске %s с ID: %s. Error: %s', cls.model.__name__, data_id, e)
             raise
         
 
     @classmethod
     async def find_one_or_none(cls, filters: dict, db: AsyncSession):
-        logger.info(f'Поиск одной записи {cls.model.__name__} по фильтрам: {filters}')
+        logger.info('Поиск одной записи %s по фильтрам: %s', cls.model.__name__, filters)
         try:
             query = select(cls.model).filter_by(**filters)
             result = await db.execute(query)
             record = result.scalar_one_or_none()
             if record:
-                logger.info(f'Найдена одна запись {cls.model.__name__} по фильтрам: {filters}')
+                logger.info('Найдена одна запись %s по фильтрам: %s', cls.model.__name__, filters)
             else:
-                logger.info(f'Не найдена одна запись {cls.model.__name__} по фильтрам: {filters}')
+                logger.info('Не найдена одна запись %s по фильтрам: %s', cls.model.__name__, filters)
             return record
         except SQLAlchemyError as e:
-            logger.error(f'Ошибка при поиске одной записи {cls.model.__name__} по фильтрам: {filters}. Error: {e}')
+            logger.error('Ошибка при поиске одной записи %s по фильтрам: %s. Error: %s', cls.model.__name__, filters, e)
             raise
         
     
@@ -57,48 +116,50 @@ class BaseDAO(Generic[T]):
             logger.info('Ничего не предали!')
             raise HTTPException(status_code=400, detail='Ничего не передали')
 
-        logger.info(f'Поиск всех записей {cls.model.__name__} по фильтрам: {filters_dict}')
+        logger.info('Поиск всех записей %s по фильтрам: %s', cls.model.__name__, filters_dict)
         try:
             query = select(cls.model).filter_by(**filters_dict)
             result = await db.execute(query)
             records = result.scalars().all()
-            logger.info(f'Найдены всего записи {len(records)} по фильтрам: {filters_dict}')
+            logger.info('Найдены всего записи %s по фильтрам: %s', len(records), filters_dict)
             return records
         except SQLAlchemyError as e:
-            logger.error(f'Ошибка при поиске всех записей {cls.model.__name__} по фильтрам: {filters_dict}. Error: {e}')
+            logger.error('Ошибка при поиске всех записей %s по фильтрам: %s. Error: %s', cls.model.__name__, filters_dict, e)
             raise
 
 
     @classmethod
     async def add(cls, data: dict, db: AsyncSession):
-        logger.info(f'Добавление записи {cls.model.__name__} с параметрами: {data}')
+        logger.info('Добавление записи %s с параметрами: %s', cls.model.__name__, data)
         new_instance = cls.model(**data)
         try:
             db.add(new_instance)
-            await db.flush()
-            await db.commit()
-            logger.info(f'Запись {cls.model.__name__} успешно добавлена.')
+            await cls._commit(db)
+            logger.info('Запись %s успешно добавлена.', cls.model.__name__)
         except SQLAlchemyError as e:
-            await db.rollback()
-            logger.info(f'Ошибка при добавлении записи: {e}')
+            await cls._rollback(db)
+            logger.info('Ошибка при добавлении записи: %s', e)
             raise
         return new_instance
     
 
     @classmethod
-    async def add_many(cls, data: List[BaseModel], db: AsyncSession):
-        data_dict = [item.model_dump(exclude_unset=True) for item in data]
-        logger.info(f'Добавление множества записей {cls.model.__name__} с параметрами: {data_dict}')
+    async def add_many(cls, data: List[BaseModel | dict], db: AsyncSession):
+        """
+        Добавляет записи пакетом: INSERT выполняется многострочными запросами (insertmanyvalues),
+        ID новых записей возвращаются через RETURNING.
+        """
+        data_dict = [item.model_dump(exclude_unset=True) if isinstance(item, BaseModel) else item for item in data]
+        logger.info('Добавление множества записей %s: %s', cls.model.__name__, len(data_dict))
         new_instances = [cls.model(**values) for values in data_dict]
         try:
             db.add_all(new_instances)
-            await db.flush()
-            await db.commit()
-            logger.info(f'Записи {cls.model.__name__} успешно добавлены.')
+            await cls._commit(db)
+            logger.info('Записи %s успешно добавлены.', cls.model.__name__)
             return new_instances
         except SQLAlchemyError as e:
-            await db.rollback()
-            logger.info(f'Ошибка при добавлении множества записей: {e}')
+            await cls._rollback(db)
+            logger.info('Ошибка при добавлении множества записей: %s', e)
             raise
 
     
@@ -106,7 +167,7 @@ class BaseDAO(Generic[T]):
     async def update(cls, filters: BaseModel, data: BaseModel, db: AsyncSession):
         filter_dict = filters.model_dump(exclude_unset=True)
         data_dict = data.model_dump(exclude_unset=True)
-        logger.info(f'Обновление записей {cls.model.__name__} по фильтрам: {filter_dict} с новыми данными: {data_dict}')
+        logger.info('Обновление записей %s по фильтрам: %s с новыми данными: %s', cls.model.__name__, filter_dict, data_dict)
         query = (
             
             update(cls.model)
@@ -117,75 +178,78 @@ class BaseDAO(Generic[T]):
         )
         try:
             result = await db.execute(query)
-            await db.flush()
-            await db.commit()
-            logger.info(f"Обновлено {result.rowcount} записей.")
+            await cls._commit(db)
+            logger.info("Обновлено %s записей.", result.rowcount)
             return result.rowcount
         except SQLAlchemyError as e:
-            await db.rollback()
-            logger.info(f"Ошибка при обновлении записей: {e}")
+            await cls._rollback(db)
+            logger.info("Ошибка при обновлении записей: %s", e)
             raise
 
 
     @classmethod
     async def delete(cls, filters: BaseModel, db: AsyncSession):
         filter_dict = filters.model_dump(exclude_unset=True)
-        logger.info(f'Удаление записей {cls.model.__name__} по фильтрам: {filter_dict}')
+        logger.info('Удаление записей %s по фильтрам: %s', cls.model.__name__, filter_dict)
         if not filter_dict:
             logger.info('Ничего не предали!')
             raise ValueError('Ничего не передали')
         query = delete(cls.model).filter_by(**filter_dict)
         try:
             result = await db.execute(query)
-            await db.flush()
-            await db.commit()
-            logger.info(f'Удалено {result.rowcount} записей.')
+            await cls._commit(db)
+            logger.info('Удалено %s записей.', result.rowcount)
             return result.rowcount
         except SQLAlchemyError as e:
-            await db.rollback()
-            logger.info(f'Ошибка при удалении записей: {e}')
+            await cls._rollback(db)
+            logger.info('Ошибка при удалении записей: %s', e)
             raise
 
 
     @classmethod
     async def count(cls, filters: BaseModel, db: AsyncSession):
         filters_dict = filters.model_dump(exclude_unset=True)
-        logger.info(f'Подсчет количества записей {cls.model.__name__} по фильтрам: {filters_dict}')
+        logger.info('Подсчет количества записей %s по фильтрам: %s', cls.model.__name__, filters_dict)
         try:
             query = select(func.count(cls.model.id).filter(**filters_dict))
             result = await db.execute(query)
             count = result.scalar()
-            logger.info(f'Найдено {count} записей.')
+            logger.info('Найдено %s записей.', count)
             return count
         except SQLAlchemyError as e:
-            logger.error(f'Ошибка при подсчете количества записей: {e}')
+            logger.error('Ошибка при подсчете количества записей: %s', e)
             raise
 
     
     @classmethod
     async def paginate(cls, filters: BaseModel, db: AsyncSession, page: int = 1, page_size: int = 10):
         filters_dict = filters.model_dump(exclude_unset=True) if filters else {}
-        logger.info(f'Пагинация записей {cls.model.__name__} по фильтрам: {filters_dict} на странице {page} со смещением {page_size}')
+        logger.info('Пагинация записей %s по фильтрам: %s на странице %s со смещением %s', cls.model.__name__, filters_dict, page, page_size)
         try:
             query = select(cls.model).filter_by(**filters_dict)
             result = await db.execute(query.offset(page - 1) * page_size).limit(page_size)
             records = result.scalars().all()
-            logger.info(f'Найдено {len(records)} записей.')
+            logger.info('Найдено %s записей.', len(records))
             return records
         except SQLAlchemyError as e:
-            logger.error(f'Ошибка при пагинации записей: {e}')
+            logger.error('Ошибка при пагинации записей: %s', e)
             raise
 
 
     @classmethod
-    async def find_by_ids(cls, ids: List[int], db: AsyncSession) -> List[Any]:
-        logger.info(f"Поиск записей {cls.model.__name__} по списку ID: {ids}")
+    async def find_by_ids(cls, ids: List[int], db: AsyncSession, options: List[Any] | None = None) -> List[Any]:
+        logger.info("Поиск записей %s по списку ID: %s", cls.model.__name__, ids)
         try:
             query = select(cls.model).filter(cls.model.id.in_(ids))
+            if options:
+                query = query.options(*options)
             result = await db.execute(query)
             records = result.scalars().all()
-            logger.info(f"Найдено {len(records)} записей по списку ID.")
+            logger.info("Найдено %s записей по списку ID.", len(records))
             return records
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при поиске записей по списку ID: {e}")
+            logger.error("Ошибка при поиске записей по списку ID: %s", e)
             raise
+
+
+instrument_dao(BaseDAO)
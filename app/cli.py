@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from app.database.db import AsyncSession
+from app.auth.schemas import User  # регистрирует модель User для связи Blog.user
+from app.api.dao import BlogDAO
+from app.api.services import export_blogs, import_blogs
+from app.config import EXPORT_BATCH_SIZE, IMPORT_BATCH_SIZE
+from app.logger import logger
+
+
+async def render_markdown_command(args: argparse.Namespace) -> None:
+    async with AsyncSession() as db:
+        total = await BlogDAO.backfill_rendered_content(db=db, batch_size=args.batch_size)
+    logger.info('Перерисовка завершена, обработано блогов: %s', total)
+
+
+async def export_blogs_command(args: argparse.Namespace) -> None:
+    output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        async for chunk in export_blogs(updated_since=args.updated_since, batch_size=args.batch_size):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+async def read_lines(path: str):
+    source = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    try:
+        for line in source:
+            yield line
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+
+
+async def import_blogs_command(args: argparse.Namespace) -> None:
+    async with AsyncSession() as db:
+        report = await import_blogs(db=db, lines=read_lines(args.input), batch_size=args.batch_size)
+    for error in report['errors']:
+        logger.warning("Строка %s: %s", error['line'], error['error'])
+    print(json.dumps({'imported': report['imported'], 'failed': report['failed']}))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m app.cli', description='Служебные команды mini_blog')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    render_parser = subparsers.add_parser(
+        'render-markdown',
+        help='Заполнить content_html для блогов без HTML или с устаревшей версией рендерера',
+    )
+    render_parser.add_argument('--batch-size', type=int, default=500)
+    render_parser.set_defaults(handler=render_markdown_command)
+
+    export_parser = subparsers.add_parser(
+        'export-blogs',
+        help='Выгрузить опубликованные блоги с тегами и авторами в NDJSON',
+    )
+    export_parser.add_argument('--output', default='-', help='Файл для записи, по умолчанию stdout')
+    export_parser.add_argument('--updated-since', type=datetime.fromisoformat, default=None,
+                               help='Только блоги, измененные после этой даты (ISO 8601)')
+    export_parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE)
+    export_parser.set_defaults(handler=export_blogs_command)
+
+    import_parser = subparsers.add_parser(
+        'import-blogs',
+        help='Импортировать блоги с тегами из NDJSON (формат export-blogs также принимается)',
+    )
+    import_parser.add_argument('--input', default='-', help='Файл NDJSON, по умолчанию stdin')
+    import_parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    import_parser.set_defaults(handler=import_blogs_command)
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -14,9 +14,92 @@ DB_HOST = getenv('DB_HOST')
 DB_PORT = getenv('DB_PORT')
 DB_NAME = getenv('DB_NAME')
 
-DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+# Полный адрес БД (например, тестовой) заменяет параметры DB_*
+DATABASE_URL = getenv('DATABASE_URL') or f'postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+
+
+def getenv_bool(name: str, default: bool) -> bool:
+    value = getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Пул соединений SQLAlchemy
+DB_POOL_SIZE = int(getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = getenv_bool('DB_POOL_PRE_PING', True)
+# Сколько соединений открыть при старте приложения
+DB_POOL_WARMUP = int(getenv('DB_POOL_WARMUP', DB_POOL_SIZE))
+# Кэш подготовленных выражений asyncpg
+DB_STATEMENT_CACHE_SIZE = int(getenv('DB_STATEMENT_CACHE_SIZE', 100))
+# Работа через PgBouncer в режиме transaction pooling: кэши подготовленных выражений отключаются
+DB_PGBOUNCER = getenv_bool('DB_PGBOUNCER', False)
+# In-memory индекс тегов для фильтра /api/blogs?tags=...&mode=all|any
+TAG_INDEX_ENABLED = getenv_bool('TAG_INDEX_ENABLED', False)
+TAG_INDEX_REFRESH_SECONDS = int(getenv('TAG_INDEX_REFRESH_SECONDS', 300))
+# Метрики Prometheus на /metrics
+METRICS_ENABLED = getenv_bool('METRICS_ENABLED', True)
+# Токен для сборщика метрик (Authorization: Bearer <токен>); без него /metrics доступен только администраторам
+METRICS_TOKEN = getenv('METRICS_TOKEN')
+# Логирование: уровень, запись в отдельном потоке через очередь, маскируемые поля
+LOG_LEVEL = getenv('LOG_LEVEL', 'INFO')
+LOG_QUEUE_ENABLED = getenv_bool('LOG_QUEUE_ENABLED', True)
+LOG_REDACT_FIELDS = [field.strip() for field in getenv(
+    'LOG_REDACT_FIELDS', 'password,password_hash,token,access_token,refresh_token'
+).split(',') if field.strip()]
+# Доля сообщений ниже WARNING по логгерам, например: app.dao=0.1,app.api=0.5
+LOG_SAMPLING = {
+    name.strip(): float(rate)
+    for name, rate in (item.split('=', 1) for item in getenv('LOG_SAMPLING', '').split(',') if '=' in item)
+}
+# Служебные эндпоинты /internal/*
+INTERNAL_ENDPOINTS_ENABLED = getenv_bool('INTERNAL_ENDPOINTS_ENABLED', True)
+
+# Кэш ответов ленты (/api/blogs, /blogs/): memory | redis | off
+RESPONSE_CACHE_BACKEND = getenv('RESPONSE_CACHE_BACKEND', 'memory')
+RESPONSE_CACHE_TTL = int(getenv('RESPONSE_CACHE_TTL', 30))
+RESPONSE_CACHE_SIZE = int(getenv('RESPONSE_CACHE_SIZE', 1024))
+# Адрес Redis-совместимого сервера для RESPONSE_CACHE_BACKEND=redis
+RESPONSE_CACHE_URL = getenv('RESPONSE_CACHE_URL', 'redis://localhost:6379/0')
+# Стратегия подсчета общего количества блогов в ленте: exact | cached | estimated
+BLOG_COUNT_MODE = getenv('BLOG_COUNT_MODE', 'cached')
+BLOG_COUNT_CACHE_TTL = int(getenv('BLOG_COUNT_CACHE_TTL', 30))
+BLOG_COUNT_CACHE_SIZE = int(getenv('BLOG_COUNT_CACHE_SIZE', 1024))
+# Ниже этого порога оценка планировщика заменяется точным подсчетом
+BLOG_COUNT_ESTIMATE_THRESHOLD = int(getenv('BLOG_COUNT_ESTIMATE_THRESHOLD', 1000))
+# Путь чтения лент и блога: orm - загрузка ORM-объектов с selectinload,
+# core - запросы Core с агрегацией тегов в SQL (json_agg), включается явно
+BLOG_READ_PATH = getenv('BLOG_READ_PATH', 'orm')
+# Размер пакета при потоковой выгрузке блогов в NDJSON
+EXPORT_BATCH_SIZE = int(getenv('EXPORT_BATCH_SIZE', 1000))
+# Размер пакета при импорте блогов из NDJSON
+IMPORT_BATCH_SIZE = int(getenv('IMPORT_BATCH_SIZE', 500))
+# Режим фильтра по тегу по умолчанию: exact | prefix | fuzzy.
+# fuzzy сохраняет прежнее поведение API: поиск тега по подстроке (ILIKE '%tag%')
+TAG_MATCH_MODE = getenv('TAG_MATCH_MODE', 'fuzzy')
+
+# Хеширование паролей bcrypt в отдельном пуле: thread | process
+PASSWORD_HASH_EXECUTOR = getenv('PASSWORD_HASH_EXECUTOR', 'thread')
+PASSWORD_HASH_WORKERS = int(getenv('PASSWORD_HASH_WORKERS', 4))
+# Сколько запросов может ждать свободного воркера, сверх лимита возвращается 503
+PASSWORD_HASH_QUEUE_LIMIT = int(getenv('PASSWORD_HASH_QUEUE_LIMIT', 32))
+BCRYPT_ROUNDS = int(getenv('BCRYPT_ROUNDS', 12))
+
+# Режим аутентификации: db - пользователь загружается из БД на каждый запрос,
+# stateless - данные пользователя берутся из claims короткоживущего access-токена
+AUTH_MODE = getenv('AUTH_MODE', 'db')
+# В режиме db по умолчанию сохраняется прежний срок жизни токена (30 дней)
+ACCESS_TOKEN_EXPIRE_MINUTES = int(getenv('ACCESS_TOKEN_EXPIRE_MINUTES', 15 if AUTH_MODE == 'stateless' else 30 * 24 * 60))
+REFRESH_TOKEN_EXPIRE_DAYS = int(getenv('REFRESH_TOKEN_EXPIRE_DAYS', 30))
+# Кэш пользователей для режима db (0 - отключен) и кэш декодированных JWT
+AUTH_USER_CACHE_TTL = int(getenv('AUTH_USER_CACHE_TTL', 30))
+AUTH_USER_CACHE_SIZE = int(getenv('AUTH_USER_CACHE_SIZE', 10000))
+AUTH_TOKEN_CACHE_TTL = int(getenv('AUTH_TOKEN_CACHE_TTL', 60))
+AUTH_TOKEN_CACHE_SIZE = int(getenv('AUTH_TOKEN_CACHE_SIZE', 10000))
 
-print(ALGORITHM)
 
 def get_auth_data():
     return {'secret_key': SECRET_KEY, 'algorithm': ALGORITHM}
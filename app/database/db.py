@@ -1,23 +1,159 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncAttrs, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, declared_attr
-from app.config import DATABASE_URL
+from app.config import (DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+                        DB_POOL_PRE_PING, DB_POOL_WARMUP, DB_STATEMENT_CACHE_SIZE, DB_PGBOUNCER)
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, func, TIMESTAMP
+from sqlalchemy import Integer, func, TIMESTAMP, text, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.engine import URL, make_url
 from datetime import datetime
+from fastapi import Request
+from time import perf_counter
+from uuid import uuid4
+import asyncio
+from app.logger import logger
+from app.metrics import db_pool_wait, db_queries_total, instrument_engine
 
-engine = create_async_engine(DATABASE_URL)
+
+class PoolStats:
+    """Счетчики пула соединений: сколько раз и как долго запросы ждали соединение."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record_wait(self, wait_time: float) -> None:
+        self.checkouts += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        db_pool_wait.observe(wait_time)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, измеряющий время ожидания соединения (включая установку нового)."""
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record_wait(perf_counter() - start)
+
+
+def get_engine_options() -> dict:
+    connect_args = {'statement_cache_size': 0 if DB_PGBOUNCER else DB_STATEMENT_CACHE_SIZE}
+    if DB_PGBOUNCER:
+        # В transaction pooling соединения с сервером меняются между транзакциями,
+        # поэтому имена подготовленных выражений должны быть уникальными
+        connect_args['prepared_statement_name_func'] = lambda: f'__asyncpg_{uuid4()}__'
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        # Значения параметров (password_hash, токены) не попадают в текст исключений и логи
+        'hide_parameters': True,
+    }
+    # Параметры кэша выражений есть только у asyncpg (в тестах может использоваться aiosqlite)
+    if make_url(DATABASE_URL).get_driver_name() == 'asyncpg':
+        options['connect_args'] = connect_args
+    return options
+
+
+def get_database_url() -> URL:
+    url = make_url(DATABASE_URL)
+    if DB_PGBOUNCER:
+        # Кэш подготовленных выражений диалекта SQLAlchemy задается параметром URL
+        url = url.update_query_dict({'prepared_statement_cache_size': '0'})
+    return url
+
+
+engine = create_async_engine(get_database_url(), **get_engine_options())
 
 AsyncSession =  async_sessionmaker(bind=engine, expire_on_commit=False)
 
 
-def get_session():
-    session = AsyncSession()
-    try:
+instrument_engine(engine)
+
+
+async def get_session(request: Request):
+    """
+    Зависимость FastAPI, выдающая одну сессию на запрос.
+    Все зависимости и обработчики одного запроса получают одну и ту же сессию
+    (а значит, одно соединение из пула), сессия сохраняется в request.state.
+    По завершении запроса сессия асинхронно закрывается: незафиксированная транзакция
+    откатывается, соединение возвращается в пул.
+    """
+    session = getattr(request.state, 'db_session', None)
+    if session is not None:
         yield session
+        return
+
+    async with AsyncSession() as session:
+        request.state.db_session = session
+        try:
+            yield session
+        finally:
+            request.state.db_session = None
+
+
+async def release_connection(session) -> None:
+    """
+    Завершает читающую транзакцию сессии, чтобы соединение вернулось в пул
+    на время ожидания (например, общей загрузки в single-flight). Объекты сессии
+    остаются доступными (expire_on_commit=False), при следующем запросе сессия
+    возьмет соединение заново.
+    """
+    if session.in_transaction():
+        await session.commit()
+
+
+async def warm_up_pool(connections: int = DB_POOL_WARMUP) -> None:
+    """
+    Заранее открывает соединения пула, чтобы первые запросы не тратили время
+    на установку соединения. Ошибки только логируются: приложение стартует и без БД.
+    """
+    async def _connect():
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+
+    try:
+        await asyncio.gather(*[_connect() for _ in range(connections)])
+        logger.info('Пул соединений прогрет: %s соединений', connections)
     except Exception as e:
-        raise e
-    finally:
-        session.close()
+        logger.error('Не удалось прогреть пул соединений: %s', e)
+
+
+def get_pool_stats() -> dict:
+    pool = engine.pool
+    stats = {
+        'pool_class': type(pool).__name__,
+        'checkouts': pool_stats.checkouts,
+        'timeouts': pool_stats.timeouts,
+        'wait_time_total': round(pool_stats.wait_time_total, 6),
+        'wait_time_avg': round(pool_stats.wait_time_total / pool_stats.checkouts, 6) if pool_stats.checkouts else 0.0,
+        'wait_time_max': round(pool_stats.wait_time_max, 6),
+        'queries': int(db_queries_total.total()),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        })
+    return stats
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -0,0 +1,80 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import HTTPException, Request, Response
+
+
+PUBLIC_REVALIDATE = 'public, max-age=0, must-revalidate'
+PRIVATE_REVALIDATE = 'private, no-cache'
+
+
+class CacheValidators:
+    """Валидаторы условного GET для одного ответа."""
+
+    def __init__(self, etag: str, last_modified: datetime, cache_control: str, vary: str | None = None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.cache_control = cache_control
+        self.vary = vary
+
+    @property
+    def headers(self) -> dict:
+        headers = {
+            'ETag': self.etag,
+            'Last-Modified': format_http_date(self.last_modified),
+            'Cache-Control': self.cache_control,
+        }
+        if self.vary:
+            headers['Vary'] = self.vary
+        return headers
+
+    def apply(self, response: Response) -> None:
+        response.headers.update(self.headers)
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def format_http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        # updated_at хранится как TIMESTAMP без часового пояса, считаем его UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(request: Request, validators: CacheValidators) -> bool:
+    """
+    Проверяет If-None-Match и If-Modified-Since (If-None-Match имеет приоритет, RFC 9110).
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        # Слабое сравнение: префикс W/ не учитывается
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return validators.etag.removeprefix('W/') in tags
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        last_modified = validators.last_modified
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def raise_if_not_modified(request: Request, validators: CacheValidators | None) -> CacheValidators | None:
+    """
+    Прерывает обработку запроса ответом 304 без тела, если клиентская копия актуальна.
+    """
+    if validators is not None and is_not_modified(request, validators):
+        raise HTTPException(status_code=304, headers=validators.headers)
+    return validators
@@ -0,0 +1,70 @@
+import hmac
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.metrics import registry, GaugeCollector
+from app.database.db import get_pool_stats, get_session
+from app.auth.cache import user_cache, token_cache
+from app.api.dao import BlogDAO
+from app.api.services import blog_page_flight
+from app.response_cache import response_cache
+from app.auth.auth import get_token, get_current_user, get_current_admin_user
+from app.config import METRICS_TOKEN
+
+
+async def verify_metrics_access(request: Request, db: AsyncSession = Depends(get_session)) -> None:
+    """
+    Доступ к /metrics: сборщику метрик по токену METRICS_TOKEN в заголовке Authorization,
+    остальным - только администраторам (как к /internal/*).
+    """
+    if METRICS_TOKEN and hmac.compare_digest(request.headers.get('authorization', '').encode(),
+                                             f'Bearer {METRICS_TOKEN}'.encode()):
+        return
+    await get_current_admin_user(await get_current_user(db=db, token=get_token(request)))
+
+
+router = APIRouter(tags=['INTERNAL'], include_in_schema=False, dependencies=[Depends(verify_metrics_access)])
+
+
+def _pool_gauges():
+    stats = get_pool_stats()
+    for key in ('size', 'checked_out', 'checked_in', 'overflow', 'timeouts'):
+        if key in stats:
+            yield key, stats[key]
+
+
+def _cache_stats() -> dict:
+    caches = {
+        'auth_users': user_cache.stats(),
+        'auth_tokens': token_cache.stats(),
+        'blog_counts': BlogDAO.count_cache.stats(),
+    }
+    if response_cache is not None:
+        caches['responses'] = response_cache.stats()
+    return caches
+
+
+def _cache_gauges(field: str):
+    def collect():
+        for name, stats in _cache_stats().items():
+            yield name, stats[field]
+    return collect
+
+
+def _singleflight_gauges():
+    stats = blog_page_flight.stats()
+    for key in ('calls', 'executions', 'shared', 'in_flight'):
+        yield 'blog_page', key, stats[key]
+
+
+registry.register(GaugeCollector('db_pool_connections', 'Состояние пула соединений', ('state',), _pool_gauges))
+registry.register(GaugeCollector('cache_hits', 'Попадания в in-process кэши', ('cache',), _cache_gauges('hits')))
+registry.register(GaugeCollector('cache_misses', 'Промахи in-process кэшей', ('cache',), _cache_gauges('misses')))
+registry.register(GaugeCollector('cache_hit_ratio', 'Доля попаданий в кэш', ('cache',), _cache_gauges('hit_ratio')))
+registry.register(GaugeCollector('singleflight_calls', 'Объединение конкурентных загрузок', ('group', 'kind'),
+                                 _singleflight_gauges))
+
+
+@router.get('/metrics', summary='Метрики в формате Prometheus')
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+from app.database.db import get_pool_stats
+from app.metrics import db_queries_total
+from app.auth.auth import get_current_admin_user
+from app.auth.cache import get_auth_cache_stats
+from app.api.dao import BlogDAO
+from app.api.services import blog_page_flight
+from app.api.tag_index import tag_index
+from app.response_cache import response_cache
+
+
+# Состояние пула, кэшей и трафика доступно только администраторам
+router = APIRouter(prefix='/internal', tags=['INTERNAL'], include_in_schema=False,
+                   dependencies=[Depends(get_current_admin_user)])
+
+
+@router.get('/pool', summary='Состояние пула соединений с БД')
+async def pool_stats() -> dict:
+    return get_pool_stats()
+
+
+@router.get('/caches', summary='Статистика in-process кэшей')
+async def caches_stats() -> dict:
+    return {
+        **get_auth_cache_stats(),
+        'blog_counts': BlogDAO.count_cache.stats(),
+        'responses': response_cache.stats() if response_cache is not None else None,
+    }
+
+
+@router.get('/tag_index', summary='Состояние и расход памяти индекса тегов')
+async def tag_index_stats() -> dict:
+    return tag_index.memory_usage()
+
+
+@router.get('/singleflight', summary='Объединение конкурентных загрузок страниц блогов')
+async def singleflight_stats() -> dict:
+    return {
+        'blog_page': blog_page_flight.stats(),
+        'db_queries': int(db_queries_total.total()),
+    }
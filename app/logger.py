@@ -1,5 +1,151 @@
+import atexit
+import copy
 import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO
+from pydantic import BaseModel
+from app.config import LOG_LEVEL, LOG_QUEUE_ENABLED, LOG_SAMPLING, LOG_REDACT_FIELDS
 
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
\ No newline at end of file
+LOG_FORMAT = '%(levelname)s:%(name)s:%(message)s'
+REDACTED = '***'
+
+
+class RedactingFilter(logging.Filter):
+    """
+    Маскирует значения чувствительных полей (password_hash, токены) в аргументах записи:
+    в словарях, списках и моделях Pydantic. Работает только при ленивом форматировании
+    (logger.info('... %s', data)), так как f-строка уже содержит значения.
+    """
+
+    def __init__(self, fields):
+        super().__init__()
+        self.fields = frozenset(fields)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.args:
+            record.args = self._redact(record.args)
+        return True
+
+    def _redact(self, value):
+        if isinstance(value, dict):
+            return {key: REDACTED if key in self.fields else self._redact(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._redact(item) for item in value)
+        if isinstance(value, BaseModel):
+            return self._redact(value.model_dump())
+        return value
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает только долю записей ниже WARNING для заданных логгеров (и их потомков),
+    например {'app.dao': 0.1}. Предупреждения и ошибки не отбрасываются.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            parts = name.split('.')
+            for size in range(len(parts), 0, -1):
+                prefix = '.'.join(parts[:size])
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler, который формирует сообщение только для записей, прошедших уровень и фильтры
+    обработчика (в том числе SamplingFilter). Маскирование, getMessage() и трассировка исключения
+    выполняются в prepare, то есть в вызывающем потоке (потоке event loop); в потоке QueueListener
+    выполняются только форматирование по LOG_FORMAT и запись в поток.
+
+    В очередь попадает копия записи с замаскированными аргументами и готовым сообщением:
+    args и exc_info очищаются, как в QueueHandler, а трассировка сохраняется в exc_text.
+    """
+
+    def __init__(self, queue, redactor: RedactingFilter | None = None):
+        super().__init__(queue)
+        self.redactor = redactor
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if self.redactor is not None:
+            self.redactor.filter(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+_listener: QueueListener | None = None
+
+
+def setup_logging(stream: IO | None = None, level: str = LOG_LEVEL, queue_enabled: bool = LOG_QUEUE_ENABLED,
+                  sampling: dict[str, float] = LOG_SAMPLING) -> None:
+    """
+    Настраивает корневой логгер: запись в stream (по умолчанию stderr) с маскированием полей.
+    При queue_enabled запись выполняется в отдельном потоке (QueueHandler/QueueListener),
+    и event loop не блокируется на вводе-выводе.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    stream_handler = logging.StreamHandler(stream or sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    redactor = RedactingFilter(LOG_REDACT_FIELDS)
+
+    if queue_enabled:
+        log_queue = queue.SimpleQueue()
+        # Маскирование выполняется в prepare, после фильтров обработчика: до потока записи args не доходят
+        handler = LazyQueueHandler(log_queue, redactor=redactor)
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = stream_handler
+    handler.addFilter(SamplingFilter(sampling))
+    if not queue_enabled:
+        handler.addFilter(redactor)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers[:] = [handler]
+
+
+def shutdown_logging() -> None:
+    """Дописывает оставшиеся в очереди записи и останавливает поток записи."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+setup_logging()
+atexit.register(shutdown_logging)
+
+logger = logging.getLogger(__name__)
+# Логгер DAO: самые частые сообщения, для него удобно задавать LOG_SAMPLING=app.dao=0.1
+dao_logger = logging.getLogger('app.dao')
@@ -1,14 +1,62 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .auth.router import router as router_auth
 from .api.router import router as router_blog
 from .pages.router import router as frontend_router
+from .internal.router import router as internal_router
+from .internal.metrics import router as metrics_router
+from .metrics import MetricsMiddleware
+from .auth.auth import password_hasher
+from .database.db import engine, warm_up_pool, AsyncSession
+from .config import INTERNAL_ENDPOINTS_ENABLED, METRICS_ENABLED, TAG_INDEX_ENABLED, TAG_INDEX_REFRESH_SECONDS
+from .api.tag_index import tag_index
+from .response_cache import response_cache
+from .responses import FastJSONResponse
+from .logger import logger
+import asyncio
 from fastapi.staticfiles import StaticFiles
 # dfsrgdfgdfgd
 
-app = FastAPI()
+
+async def build_tag_index() -> None:
+    try:
+        async with AsyncSession() as db:
+            await tag_index.build(db)
+    except Exception as e:
+        logger.error('Не удалось построить индекс тегов: %s', e)
+
+
+async def refresh_tag_index() -> None:
+    while True:
+        await asyncio.sleep(TAG_INDEX_REFRESH_SECONDS)
+        await build_tag_index()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up_pool()
+    refresh_task = None
+    if TAG_INDEX_ENABLED:
+        await build_tag_index()
+        refresh_task = asyncio.create_task(refresh_tag_index())
+    yield
+    if refresh_task:
+        refresh_task.cancel()
+    password_hasher.shutdown()
+    if response_cache is not None:
+        await response_cache.close()
+    await engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 app.include_router(router_auth)
 app.include_router(router_blog)
 app.include_router(frontend_router)
+if INTERNAL_ENDPOINTS_ENABLED:
+    app.include_router(internal_router)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
 app.mount('/static', StaticFiles(directory='app/static'), name='static')
 
 
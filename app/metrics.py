@@ -0,0 +1,276 @@
+import functools
+import inspect
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Iterable
+from sqlalchemy import event
+
+
+# Границы корзин гистограмм (секунды), как у prometheus_client по умолчанию
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+# Метод DAO, выполняющийся в текущей задаче (например, 'BlogDAO.get_list_blog')
+current_dao_method: ContextVar[str] = ContextVar('current_dao_method', default='none')
+# Счетчики запросов к БД в рамках текущего HTTP-запроса
+current_request_db: ContextVar['RequestDBStats | None'] = ContextVar('current_request_db', default=None)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def total(self) -> float:
+        """Сумма значений по всем меткам."""
+        return sum(self._values.values())
+
+    def collect(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in self._values.items():
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (float('inf'),)
+        # labels -> [счетчики по корзинам (не накопительные), сумма, количество]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        item = self._values.get(labels)
+        if item is None:
+            item = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        item[0][bisect_left(self.buckets, value)] += 1
+        item[1] += value
+        item[2] += 1
+
+    def collect(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, (bucket_counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}'
+
+
+class GaugeCollector:
+    """Метрики, значения которых вычисляются в момент опроса (состояние пула, кэшей)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, callback: Callable[[], Iterable[tuple]]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def collect(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} gauge'
+        for *labels, value in self.callback():
+            yield f'{self.name}{_format_labels(self.labelnames, tuple(labels))} {_format_value(value)}'
+
+
+class Registry:
+    def __init__(self):
+        self.collectors = []
+
+    def register(self, collector):
+        self.collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        lines = []
+        for collector in self.collectors:
+            lines.extend(collector.collect())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    'http_requests_total', 'Количество HTTP-запросов', ('method', 'route', 'status')))
+http_request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'Время обработки HTTP-запроса', ('method', 'route')))
+http_request_db_queries = registry.register(Histogram(
+    'http_request_db_queries', 'Количество запросов к БД на HTTP-запрос', ('route',), buckets=COUNT_BUCKETS))
+http_request_db_duration = registry.register(Histogram(
+    'http_request_db_duration_seconds', 'Суммарное время запросов к БД на HTTP-запрос', ('route',)))
+db_queries_total = registry.register(Counter(
+    'db_queries_total', 'Количество запросов к БД по методам DAO', ('dao_method',)))
+db_query_duration = registry.register(Histogram(
+    'db_query_duration_seconds', 'Время выполнения запроса к БД по методам DAO', ('dao_method',),
+    buckets=QUERY_BUCKETS))
+db_pool_wait = registry.register(Histogram(
+    'db_pool_wait_seconds', 'Время ожидания соединения из пула', buckets=QUERY_BUCKETS))
+
+
+class RequestDBStats:
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+
+def instrument_dao(cls) -> None:
+    """
+    Оборачивает асинхронные classmethod DAO так, чтобы на время их выполнения
+    current_dao_method содержал '<Класс>.<метод>' - этим значением помечаются запросы к БД.
+    Вложенный вызов (например, add_many из import_blogs) помечает запросы своим именем.
+    Асинхронные генераторы (stream_export) помечаются на время каждого шага итерации.
+    """
+    for name, attribute in list(vars(cls).items()):
+        if not isinstance(attribute, classmethod):
+            continue
+        func = attribute.__func__
+        if getattr(func, '__instrumented__', False):
+            continue
+        if inspect.iscoroutinefunction(func):
+            setattr(cls, name, classmethod(_with_dao_method(func)))
+        elif inspect.isasyncgenfunction(func):
+            setattr(cls, name, classmethod(_with_dao_method_gen(func)))
+
+
+def _with_dao_method(func):
+    @functools.wraps(func)
+    async def wrapper(cls, *args, **kwargs):
+        token = current_dao_method.set(f'{cls.__name__}.{func.__name__}')
+        try:
+            return await func(cls, *args, **kwargs)
+        finally:
+            current_dao_method.reset(token)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def _with_dao_method_gen(func):
+    # Между шагами управление возвращается вызывающему коду, поэтому метка ставится
+    # и снимается вокруг каждого шага, а не на все время жизни генератора
+    @functools.wraps(func)
+    async def wrapper(cls, *args, **kwargs):
+        dao_method = f'{cls.__name__}.{func.__name__}'
+        generator = func(cls, *args, **kwargs)
+        try:
+            value, error = None, None
+            while True:
+                token = current_dao_method.set(dao_method)
+                try:
+                    item = await (generator.athrow(error) if error is not None else generator.asend(value))
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current_dao_method.reset(token)
+                value, error = None, None
+                try:
+                    value = yield item
+                except GeneratorExit:
+                    raise
+                except BaseException as exc:
+                    error = exc
+        finally:
+            token = current_dao_method.set(dao_method)
+            try:
+                await generator.aclose()
+            finally:
+                current_dao_method.reset(token)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_engine(engine) -> None:
+    """Подписывает счетчики запросов на события engine (для AsyncEngine - на sync_engine)."""
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Время начала хранится в контексте выполнения: он создается на каждый запрос
+    # и не переживает упавший запрос, в отличие от conn.info
+    if context is not None:
+        context._query_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    start = getattr(context, '_query_start', None)
+    duration = perf_counter() - start if start is not None else 0.0
+    dao_method = current_dao_method.get()
+    db_queries_total.inc(dao_method)
+    db_query_duration.observe(duration, dao_method)
+
+    request_stats = current_request_db.get()
+    if request_stats is not None:
+        request_stats.queries += 1
+        request_stats.duration += duration
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: время обработки, статус и количество/время запросов к БД для каждого HTTP-запроса.
+    Маршрут берется из шаблона пути (/api/get_blog/{blog_id}), чтобы ID не раздували число меток.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        # Вызывающий код в том же процессе (нагрузочный клиент) может передать свой счетчик
+        request_stats = current_request_db.get() or RequestDBStats()
+        token = current_request_db.set(request_stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - start
+            current_request_db.reset(token)
+            route = scope.get('route')
+            route_path = getattr(route, 'path', None) or ('static' if scope['path'].startswith('/static') else 'unmatched')
+            http_requests_total.inc(scope['method'], route_path, str(status))
+            http_request_duration.observe(duration, scope['method'], route_path)
+            http_request_db_queries.observe(request_stats.queries, route_path)
+            http_request_db_duration.observe(request_stats.duration, route_path)
+
@@ -5,8 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.dao import BlogDAO
 from app.api.models import MBlogFullResponse, MBlogNotFind
 from app.auth.auth import get_current_user_optional
-from app.api.services import get_blog_info
-import markdown2
+from app.api.services import get_blog_page, get_blog_page_validators, feed_validators, get_feed_page
+from app.http_cache import CacheValidators
 
 from app.auth.schemas import User
 from app.database.db import get_session
@@ -21,21 +21,23 @@ templates = Jinja2Templates(directory='app/templates')
 async def get_blog_post(
         request: Request,
         blog_id: int,
-        blog_info: MBlogFullResponse | MBlogNotFind = Depends(get_blog_info),
-        user_data: User | None = Depends(get_current_user_optional)
+        # Валидаторы объявлены до get_blog_page: при 304 блог не загружается
+        validators: CacheValidators | None = Depends(get_blog_page_validators),
+        article: dict | None = Depends(get_blog_page),
+        user_data: User | None = Depends(get_current_user_optional),
 ):
-    if isinstance(blog_info, dict):
+    if article is None:
         return templates.TemplateResponse(
             "404.html", {"request": request, "blog_id": blog_id}
         )
     else:
-        blog = MBlogFullResponse.model_validate(blog_info).model_dump()
-        # Преобразование Markdown в HTML
-        blog['content'] = markdown2.markdown(blog['content'], extras=['fenced-code-blocks', 'tables'])
-        return templates.TemplateResponse(
+        response = templates.TemplateResponse(
             "post.html",
-            {"request": request, "article": blog, "current_user_id": user_data.id if user_data else None}
+            {"request": request, "article": article, "current_user_id": user_data.id if user_data else None}
         )
+        if validators is not None:
+            validators.apply(response)
+        return response
     
 
 @router.get('/blogs/')
@@ -43,18 +45,28 @@ async def get_blog_post(
         request: Request,
         author_id: int | None = None,
         tag: str | None = None,
+        q: str | None = None,
         page: int = 1,
         page_size: int = 3,
+        cursor: str | None = None,
+        validators: CacheValidators | None = Depends(feed_validators(default_page_size=3)),
         db: AsyncSession = Depends(get_session),
 ):
-    blogs = await BlogDAO.get_list_blog(
-        db=db,
-        author_id=author_id,
-        tag=tag,
-        page=page,
-        page_size=page_size
-    )
-    return templates.TemplateResponse(
+    if q:
+        blogs = await BlogDAO.search_blogs(db=db, q=q, page_size=page_size, cursor=cursor)
+        blogs.update({'page': None, 'total_page': None, 'prev_cursor': None})
+    else:
+        blogs = await get_feed_page(
+            db=db,
+            author_id=author_id,
+            tag=tag,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            # Шаблон ленты не выводит содержимое блога
+            view='summary',
+        )
+    response = templates.TemplateResponse(
         "posts.html",
         {
             "request": request,
@@ -62,8 +74,10 @@ async def get_blog_post(
             "filters": {
                 "author_id": author_id,
                 "tag": tag,
+                "q": q,
             }
         }
     )
-
-
+    if validators is not None:
+        validators.apply(response)
+    return response
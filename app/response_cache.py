@@ -0,0 +1,190 @@
+import json
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Iterable
+from fastapi.encoders import jsonable_encoder
+from app.config import RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_TTL, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_URL
+from app.logger import logger
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Общий бэкенд необязателен, без пакета redis доступен только memory
+    redis = None
+
+
+class MemoryResponseCache:
+    """
+    In-process LRU-кэш ответов с TTL и тегами для точечной инвалидации.
+    Значения хранятся как есть, без сериализации. Кэш локален для процесса,
+    поэтому при нескольких воркерах изменения других процессов видны по истечении TTL.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, tuple[float, Any, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    async def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None or item[0] < monotonic():
+            if item is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    async def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+        if key in self._data:
+            self._drop(key)
+        tags = tuple(tags)
+        self._data[key] = (monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.maxsize:
+            self._drop(next(iter(self._data)))
+
+    async def purge_tags(self, tags: Iterable[str]) -> int:
+        keys = set()
+        for tag in tags:
+            keys.update(self._tags.pop(tag, ()))
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    async def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'tags': len(self._tags),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+class RedisResponseCache:
+    """
+    Общий для всех воркеров кэш ответов в Redis (или совместимом сервере: KeyDB, Valkey, Dragonfly).
+    Значение хранится в JSON под ключом <prefix>key, для каждого тега ведется множество
+    <prefix>tag:<tag> с ключами записей. Ошибки Redis не ломают запрос: чтение считается
+    промахом, запись и инвалидация пропускаются с записью в лог.
+    """
+
+    backend = 'redis'
+
+    def __init__(self, url: str, ttl: float = 30, prefix: str = 'response_cache:'):
+        if redis is None:
+            raise RuntimeError('Для RESPONSE_CACHE_BACKEND=redis установите пакет redis')
+        self.client = redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _tag_key(self, tag: str) -> str:
+        return f'{self.prefix}tag:{tag}'
+
+    async def get(self, key: str) -> Any:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning('Ошибка чтения кэша ответов: %s', e)
+            raw = None
+        if raw is not None:
+            try:
+                value = json.loads(raw)
+            except ValueError as e:
+                self.errors += 1
+                logger.warning('Поврежденная запись кэша ответов %s: %s', key, e)
+                raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+        raw = json.dumps(jsonable_encoder(value), separators=(',', ':'))
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.set(self.prefix + key, raw, ex=self.ttl)
+                for tag in tags:
+                    pipe.sadd(self._tag_key(tag), self.prefix + key)
+                    pipe.expire(self._tag_key(tag), self.ttl)
+                await pipe.execute()
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning('Ошибка записи в кэш ответов: %s', e)
+
+    async def purge_tags(self, tags: Iterable[str]) -> int:
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not tag_keys:
+            return 0
+        try:
+            keys = await self.client.sunion(tag_keys)
+            await self.client.delete(*keys, *tag_keys)
+            return len(keys)
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning('Ошибка инвалидации кэша ответов: %s', e)
+            return 0
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f'{self.prefix}*'):
+            await self.client.delete(key)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+def create_response_cache():
+    """
+    Создает кэш ответов согласно RESPONSE_CACHE_BACKEND: memory, redis или off.
+    """
+    if RESPONSE_CACHE_BACKEND == 'off':
+        return None
+    if RESPONSE_CACHE_BACKEND == 'redis':
+        return RedisResponseCache(url=RESPONSE_CACHE_URL, ttl=RESPONSE_CACHE_TTL)
+    return MemoryResponseCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+
+response_cache = create_response_cache()
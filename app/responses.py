@@ -0,0 +1,15 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ, сериализуемый pydantic-core (Rust) сразу в bytes.
+    Понимает модели Pydantic (с учетом exclude), datetime и вложенные dict/list,
+    поэтому обработчик может вернуть FastJSONResponse(result) напрямую, минуя
+    jsonable_encoder и стандартный json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
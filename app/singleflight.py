@@ -0,0 +1,49 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых конкурентных загрузок (single-flight).
+    Первый вызов с ключом запускает загрузку в отдельной задаче, остальные вызовы с тем же ключом,
+    пришедшие до ее завершения, ждут тот же результат (или то же исключение).
+    Отмена одного из ожидающих запросов не отменяет общую загрузку.
+    Результат не кэшируется: после завершения задачи следующий вызов выполнит новую загрузку.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.shared = 0
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Помечает исключение полученным, даже если все ожидающие были отменены
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'executions': self.executions,
+            'shared': self.shared,
+            'in_flight': len(self._in_flight),
+            'shared_ratio': self.shared / self.calls if self.calls else 0.0,
+        }
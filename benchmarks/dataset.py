@@ -0,0 +1,238 @@
+"""
+Генератор синтетических данных для нагрузочных тестов: пользователи, теги, блоги и связки блог-тег.
+
+Популярность тегов и активность авторов распределены по закону Ципфа, тексты блогов -
+Markdown разной длины и структуры, часть блогов в статусе draft. Строки генерируются
+пакетами в пуле процессов и записываются через COPY (asyncpg) в несколько соединений.
+Содержимое пакета зависит только от --seed и номера пакета, поэтому два прогона с одинаковыми
+параметрами на пустой базе дают одинаковые данные независимо от --workers.
+
+    python -m benchmarks.dataset --users 10000 --blogs 1000000 --tags 5000 --truncate
+
+После загрузки content_html пуст: его заполняет python -m app.cli render-markdown.
+"""
+import argparse
+import asyncio
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
+from itertools import accumulate
+from time import perf_counter
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from app.database.db import engine
+from app.auth.schemas import User, Role
+from app.api.schemas import Blog, Tag
+from app.auth.auth import get_password_hash
+from app.logger import logger
+
+
+USER_COLUMNS = ('id', 'username', 'email', 'password_hash', 'first_name', 'last_name', 'role_id',
+                'created_at', 'updated_at')
+BLOG_COLUMNS = ('id', 'title', 'author', 'short_description', 'content', 'status', 'created_at', 'updated_at')
+BLOG_TAG_COLUMNS = ('blog_id', 'tag_id')
+
+# Пароль всех сгенерированных пользователей (хеш вычисляется один раз)
+SEED_PASSWORD = 'password'
+START_DATE = datetime(2020, 1, 1)
+
+WORDS = (
+    'python', 'fastapi', 'postgres', 'индекс', 'запрос', 'кэш', 'сервер', 'клиент', 'данные', 'модель',
+    'функция', 'класс', 'тест', 'релиз', 'ошибка', 'производительность', 'память', 'поток', 'очередь',
+    'событие', 'шаблон', 'страница', 'пользователь', 'блог', 'заметка', 'проект', 'команда', 'сборка',
+    'миграция', 'таблица', 'транзакция', 'соединение', 'пул', 'профиль', 'метрика', 'лог', 'контейнер',
+    'async', 'await', 'sqlalchemy', 'pydantic', 'docker', 'nginx', 'redis', 'linux', 'git', 'api',
+    'быстрый', 'простой', 'новый', 'старый', 'большой', 'надежный', 'удобный', 'сложный', 'полезный',
+    'работает', 'ускоряет', 'хранит', 'читает', 'пишет', 'проверяет', 'собирает', 'запускает', 'ищет',
+)
+FIRST_NAMES = ('Иван', 'Анна', 'Петр', 'Мария', 'Алексей', 'Ольга', 'Дмитрий', 'Елена', 'Сергей', 'Наталья')
+LAST_NAMES = ('Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов')
+
+# Параметры генерации блогов, передаются в процессы пула через initializer
+_options: dict = {}
+
+
+@lru_cache(maxsize=None)
+def zipf_weights(size: int, exponent: float) -> list[float]:
+    """Накопленные веса распределения Ципфа: элемент ранга k выбирается с вероятностью ~ 1 / k^exponent."""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def words(rng: random.Random, count: int) -> str:
+    return ' '.join(rng.choices(WORDS, k=count))
+
+
+def sentence(rng: random.Random) -> str:
+    return words(rng, rng.randint(6, 18)).capitalize() + '.'
+
+
+def markdown_body(rng: random.Random) -> str:
+    """Markdown разной длины: заголовки, абзацы, списки, цитаты, блоки кода и ссылки."""
+    parts = []
+    for section in range(max(1, int(rng.lognormvariate(1, 0.6)))):
+        parts.append(f'## {words(rng, rng.randint(2, 5)).capitalize()}')
+        for _ in range(rng.randint(1, 4)):
+            parts.append(' '.join(sentence(rng) for _ in range(rng.randint(2, 6))))
+        kind = rng.random()
+        if kind < 0.25:
+            parts.append('\n'.join(f'- {words(rng, rng.randint(2, 6))}' for _ in range(rng.randint(2, 6))))
+        elif kind < 0.4:
+            parts.append(f'```python\ndef {rng.choice(WORDS[:10])}_{section}(value):\n    return value * {rng.randint(2, 9)}\n```')
+        elif kind < 0.5:
+            parts.append(f'> {sentence(rng)}')
+        elif kind < 0.6:
+            parts.append(f'Подробнее: [{words(rng, 2)}](https://example.com/{rng.randint(1, 10 ** 6)})')
+    return '\n\n'.join(parts)
+
+
+def init_worker(options: dict) -> None:
+    _options.update(options)
+
+
+def generate_users(seed: int, batch_no: int, start_id: int, size: int, password_hash: str) -> list[tuple]:
+    rng = random.Random(f'{seed}:users:{batch_no}')
+    rows = []
+    for user_id in range(start_id, start_id + size):
+        created_at = START_DATE + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        rows.append((user_id, f'seed{seed}_user{user_id}', f'seed{seed}_user{user_id}@example.com', password_hash,
+                     rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), 1, created_at, created_at))
+    return rows
+
+
+def generate_blogs(batch_no: int, start_id: int, size: int) -> tuple[list[tuple], list[tuple]]:
+    """Строки blogs и blogtags для пакета блогов с ID start_id..start_id+size-1."""
+    options = _options
+    rng = random.Random(f'{options["seed"]}:blogs:{batch_no}')
+    author_ids, tag_ids = options['author_ids'], options['tag_ids']
+    author_weights = zipf_weights(len(author_ids), options['author_skew'])
+    tag_weights = zipf_weights(len(tag_ids), options['tag_skew'])
+    # Блоги равномерно распределены по времени, чтобы keyset-пагинация шла по реалистичным датам
+    step = options['span_days'] * 86400 / max(options['blogs'], 1)
+
+    blogs, blog_tags = [], []
+    for blog_id in range(start_id, start_id + size):
+        index = blog_id - options['first_blog_id']
+        created_at = START_DATE + timedelta(seconds=index * step + rng.uniform(0, step))
+        status = 'draft' if rng.random() < options['draft_ratio'] else 'published'
+        title = f'{words(rng, rng.randint(2, 4))[:38].capitalize()} #{blog_id}'
+        blogs.append((blog_id, title, rng.choices(author_ids, cum_weights=author_weights)[0], sentence(rng),
+                      markdown_body(rng), status, created_at, created_at))
+        count = rng.randint(0, options['max_tags'])
+        for tag_id in set(rng.choices(tag_ids, cum_weights=tag_weights, k=count)):
+            blog_tags.append((blog_id, tag_id))
+    return blogs, blog_tags
+
+
+async def copy_records(record_sets: tuple[tuple[str, tuple, list], ...]) -> None:
+    """Записывает наборы строк (таблица, колонки, строки) через COPY в одной транзакции."""
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        async with raw.transaction():
+            for table, columns, records in record_sets:
+                if records:
+                    await raw.copy_records_to_table(table, records=records, columns=columns)
+
+
+async def prepare(args: argparse.Namespace) -> tuple[int, int, list[int]]:
+    """Очищает таблицы (по --truncate), создает роль и теги. Возвращает первые свободные ID и ID тегов по рангу."""
+    async with engine.begin() as conn:
+        if args.truncate:
+            logger.info('Очистка таблиц blogtags, blogs, tags, users')
+            await conn.execute(text('TRUNCATE blogtags, blogs, tags, users RESTART IDENTITY CASCADE'))
+        if await conn.scalar(select(Role.id).where(Role.id == 1)) is None:
+            await conn.execute(insert(Role).values(id=1, name='user').on_conflict_do_nothing())
+
+        # Теги немногочисленны, поэтому пишутся обычным INSERT; имена детерминированы рангом
+        names = [f'{WORDS[rank % len(WORDS)]}-{rank}' for rank in range(args.tags)]
+        for start in range(0, len(names), 1000):
+            await conn.execute(insert(Tag).values([{'name': name} for name in names[start:start + 1000]])
+                               .on_conflict_do_nothing(index_elements=['name']))
+        ids_by_name = dict((await conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names)))).all())
+        tag_ids = [ids_by_name[name] for name in names]
+
+        first_user_id = (await conn.scalar(select(User.id).order_by(User.id.desc()).limit(1)) or 0) + 1
+        first_blog_id = (await conn.scalar(select(Blog.id).order_by(Blog.id.desc()).limit(1)) or 0) + 1
+    return first_user_id, first_blog_id, tag_ids
+
+
+async def run_batches(args: argparse.Namespace, pool: ProcessPoolExecutor, name: str, total: int, first_id: int,
+                      make_batch) -> None:
+    """Генерирует пакеты в пуле процессов и записывает их через COPY, одновременно не более --workers пакетов."""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(args.workers)
+    done, start = 0, perf_counter()
+
+    async def process(batch_no: int) -> None:
+        nonlocal done
+        batch_start = first_id + batch_no * args.batch_size
+        size = min(args.batch_size, first_id + total - batch_start)
+        async with semaphore:
+            record_sets = await loop.run_in_executor(pool, make_batch, batch_no, batch_start, size)
+            await copy_records(record_sets)
+        done += size
+        logger.info('%s: записано %s из %s (%.0f строк/с)', name, done, total, done / (perf_counter() - start))
+
+    await asyncio.gather(*(process(batch_no) for batch_no in range(-(-total // args.batch_size))))
+
+
+def user_batch(seed: int, password_hash: str, batch_no: int, start_id: int, size: int):
+    return ('users', USER_COLUMNS, generate_users(seed, batch_no, start_id, size, password_hash)),
+
+
+def blog_batch(batch_no: int, start_id: int, size: int):
+    blogs, blog_tags = generate_blogs(batch_no, start_id, size)
+    return ('blogs', BLOG_COLUMNS, blogs), ('blogtags', BLOG_TAG_COLUMNS, blog_tags)
+
+
+async def seed(args: argparse.Namespace) -> None:
+    start = perf_counter()
+    first_user_id, first_blog_id, tag_ids = await prepare(args)
+    author_ids = list(range(first_user_id, first_user_id + args.users))
+    options = {
+        'seed': args.seed, 'blogs': args.blogs, 'first_blog_id': first_blog_id, 'author_ids': author_ids,
+        'tag_ids': tag_ids, 'author_skew': args.author_skew, 'tag_skew': args.tag_skew,
+        'max_tags': args.max_tags, 'draft_ratio': args.draft_ratio, 'span_days': args.span_days,
+    }
+    with ProcessPoolExecutor(max_workers=args.processes, initializer=init_worker, initargs=(options,)) as pool:
+        password_hash = get_password_hash(SEED_PASSWORD)
+        await run_batches(args, pool, 'users', args.users, first_user_id, partial(user_batch, args.seed, password_hash))
+        await run_batches(args, pool, 'blogs', args.blogs, first_blog_id, blog_batch)
+
+    async with engine.begin() as conn:
+        for table in ('roles', 'users', 'blogs'):
+            await conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+    # ANALYZE нельзя выполнить внутри транзакции
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text('ANALYZE users, tags, blogs, blogtags'))
+    await engine.dispose()
+    logger.info('Данные сгенерированы за %.1f с: пользователей %s, тегов %s, блогов %s',
+                perf_counter() - start, args.users, args.tags, args.blogs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.dataset')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--blogs', type=int, default=100_000)
+    parser.add_argument('--tags', type=int, default=2000)
+    parser.add_argument('--max-tags', type=int, default=5, help='Максимум тегов у блога')
+    parser.add_argument('--tag-skew', type=float, default=1.1, help='Показатель распределения Ципфа для тегов')
+    parser.add_argument('--author-skew', type=float, default=0.8, help='Показатель распределения Ципфа для авторов')
+    parser.add_argument('--draft-ratio', type=float, default=0.1, help='Доля блогов в статусе draft')
+    parser.add_argument('--span-days', type=int, default=5 * 365, help='Период дат создания блогов')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=4, help='Одновременных COPY (соединений)')
+    parser.add_argument('--processes', type=int, default=None, help='Процессов генерации, по умолчанию по числу CPU')
+    parser.add_argument('--truncate', action='store_true',
+                        help='Очистить users, tags, blogs и blogtags перед генерацией (для воспроизводимых ID)')
+    args = parser.parse_args()
+    if args.users < 1 or args.tags < 1:
+        parser.error('--users и --tags должны быть положительными')
+    asyncio.run(seed(args))
+
+
+if __name__ == '__main__':
+    main()
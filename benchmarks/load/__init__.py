@@ -0,0 +1,13 @@
+"""
+Нагрузочный тест эндпоинтов: приложение запускается в том же процессе (ASGI без сети)
+против локальной PostgreSQL, запросы выполняют конкурентные асинхронные клиенты.
+
+    docker compose -f docker/docker-compose.yaml up -d
+    DB_HOST=localhost DB_PORT=5430 alembic upgrade head
+    python -m benchmarks.load --requests 2000 --concurrency 20 --output run.json
+    python -m benchmarks.load --baseline run.json --max-regression 10 --limit blog_page.p95_ms=50
+
+Для каждого сценария сохраняются p50/p95/p99, пропускная способность и число запросов к БД
+на запрос. При нарушении порогов команда завершается с кодом 1.
+Сценарий add_post создает блоги, запускайте его только на тестовой базе.
+"""
@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import sys
+from .report import build_report, check_regressions, format_table, load_report, parse_limits, save_report
+from .runner import run_scenario
+from .scenarios import SCENARIOS, Context, setup
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # Приложение импортируется после разбора аргументов: настройки читаются из окружения при импорте
+    from app.main import app
+
+    ctx = Context(app, seed=args.seed)
+    results = {}
+    async with app.router.lifespan_context(app):
+        await setup(ctx)
+        for name in args.scenarios:
+            results[name] = await run_scenario(SCENARIOS[name], ctx, requests=args.requests,
+                                               concurrency=args.concurrency, warmup=args.warmup)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load')
+    parser.add_argument('--scenarios', type=lambda value: value.split(','), default=list(SCENARIOS),
+                        help=f'Сценарии через запятую: {",".join(SCENARIOS)}')
+    parser.add_argument('--requests', type=int, default=1000, help='Запросов на сценарий')
+    parser.add_argument('--concurrency', type=int, default=20, help='Одновременных клиентов')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Файл для сохранения результатов в JSON')
+    parser.add_argument('--baseline', help='JSON предыдущего прогона для сравнения')
+    parser.add_argument('--max-regression', type=float, default=10.0,
+                        help='Допустимое ухудшение метрик относительно baseline, %%')
+    parser.add_argument('--limit', action='append', default=[],
+                        help='Абсолютный порог, например blog_page.p95_ms=50 или blogs_list.throughput_rps=500')
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'Неизвестные сценарии: {", ".join(sorted(unknown))}')
+    try:
+        limits = parse_limits(args.limit)
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = asyncio.run(run(args))
+    options = {key: getattr(args, key) for key in ('scenarios', 'requests', 'concurrency', 'warmup', 'seed')}
+    report = build_report(results, options)
+    baseline = load_report(args.baseline) if args.baseline else None
+
+    print(format_table(report, baseline))
+    if args.output:
+        save_report(report, args.output)
+
+    failures = check_regressions(report, baseline, args.max_regression, limits)
+    for failure in failures:
+        print(f'FAIL {failure}', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
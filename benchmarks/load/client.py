@@ -0,0 +1,92 @@
+from http.cookies import SimpleCookie
+from time import perf_counter
+from urllib.parse import urlencode
+import asyncio
+import json
+from app.metrics import RequestDBStats, current_request_db
+
+
+class Response:
+    def __init__(self, status: int, headers: list[tuple[bytes, bytes]], body: bytes, elapsed: float, queries: int):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+        self.queries = queries
+
+    def json(self):
+        return json.loads(self.body)
+
+    @property
+    def cookies(self) -> dict:
+        cookie = SimpleCookie()
+        for name, value in self.headers:
+            if name == b'set-cookie':
+                cookie.load(value.decode('latin-1'))
+        return {key: morsel.value for key, morsel in cookie.items()}
+
+
+class ASGIClient:
+    """
+    Клиент, вызывающий ASGI-приложение в том же процессе, без сети и HTTP-парсинга.
+    Время ответа включает всю обработку в приложении, в том числе чтение тела StreamingResponse.
+    Запросы к БД считаются слушателями engine из app.metrics через current_request_db,
+    поэтому счетчик работает и при METRICS_ENABLED=false.
+    """
+
+    def __init__(self, app, cookies: dict | None = None):
+        self.app = app
+        self.cookies = dict(cookies or {})
+
+    async def request(self, method: str, path: str, params: dict | None = None, json_body=None) -> Response:
+        body = b'' if json_body is None else json.dumps(json_body).encode()
+        headers = [(b'host', b'testserver')]
+        if json_body is not None:
+            headers.append((b'content-type', b'application/json'))
+        if self.cookies:
+            headers.append((b'cookie', '; '.join(f'{k}={v}' for k, v in self.cookies.items()).encode()))
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': urlencode(params or {}).encode(), 'root_path': '', 'headers': headers,
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        sent = False
+        finished = asyncio.Event()
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                # Клиент "отключается" только после ответа, иначе StreamingResponse прервет отправку
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        status, response_headers, chunks = 500, [], []
+
+        async def send(message):
+            nonlocal status, response_headers
+            if message['type'] == 'http.response.start':
+                status, response_headers = message['status'], message.get('headers', [])
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    finished.set()
+
+        stats = RequestDBStats()
+        token = current_request_db.set(stats)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = perf_counter() - start
+            finished.set()
+            current_request_db.reset(token)
+        return Response(status, list(response_headers), b''.join(chunks), elapsed, stats.queries)
+
+    async def get(self, path: str, params: dict | None = None) -> Response:
+        return await self.request('GET', path, params=params)
+
+    async def post(self, path: str, json_body=None) -> Response:
+        return await self.request('POST', path, json_body=json_body)
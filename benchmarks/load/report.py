@@ -0,0 +1,107 @@
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+
+# Переменные окружения, влияющие на результаты; сохраняются вместе с ними для сравнения прогонов
+SETTINGS = ('BLOG_READ_PATH', 'RESPONSE_CACHE_BACKEND', 'DB_POOL_SIZE', 'DB_MAX_OVERFLOW', 'LOG_LEVEL',
+            'LOG_SAMPLING', 'METRICS_ENABLED', 'TAG_INDEX_ENABLED')
+
+# Метрики, рост которых считается регрессией; у throughput_rps регрессия - падение
+LOWER_IS_BETTER = ('p50_ms', 'p95_ms', 'p99_ms', 'db_queries_per_request')
+HIGHER_IS_BETTER = ('throughput_rps',)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: dict, options: dict) -> dict:
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'options': options,
+        'settings': {name: os.getenv(name) for name in SETTINGS},
+        'scenarios': results,
+    }
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def parse_limits(items: list[str]) -> dict[tuple[str, str], float]:
+    """Разбирает абсолютные пороги вида 'blog_page.p95_ms=50'."""
+    limits = {}
+    for item in items:
+        key, _, value = item.partition('=')
+        scenario, _, metric = key.partition('.')
+        if not scenario or not metric or not value:
+            raise ValueError(f'Неверный порог {item!r}, ожидается <сценарий>.<метрика>=<значение>')
+        limits[(scenario, metric)] = float(value)
+    return limits
+
+
+def check_regressions(report: dict, baseline: dict | None, max_regression: float,
+                      limits: dict[tuple[str, str], float]) -> list[str]:
+    """
+    Возвращает список нарушений: ошибки запросов, превышение абсолютных порогов
+    и ухудшение метрик относительно baseline больше чем на max_regression процентов.
+    """
+    failures = []
+    for name, result in report['scenarios'].items():
+        if result['errors']:
+            failures.append(f'{name}: ошибок {result["errors"]} ({result.get("first_error")})')
+
+    for (name, metric), limit in limits.items():
+        value = report['scenarios'].get(name, {}).get(metric)
+        if value is None:
+            failures.append(f'{name}.{metric}: нет значения')
+        elif metric in HIGHER_IS_BETTER and value < limit or metric not in HIGHER_IS_BETTER and value > limit:
+            failures.append(f'{name}.{metric}: {value:.2f} при пороге {limit:.2f}')
+
+    if baseline is None:
+        return failures
+    for name, result in report['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > max_regression:
+                failures.append(f'{name}.{metric}: {old:.2f} -> {new:.2f} (хуже на {change:.1f}%)')
+    return failures
+
+
+def format_table(report: dict, baseline: dict | None = None) -> str:
+    columns = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'db_queries_per_request', 'errors')
+    lines = [f'{"сценарий":<12}' + ''.join(f'{column:>24}' for column in columns)]
+    for name, result in report['scenarios'].items():
+        previous = (baseline or {}).get('scenarios', {}).get(name, {})
+        cells = []
+        for column in columns:
+            value = result.get(column)
+            cell = '-' if value is None else f'{value:.2f}'
+            if previous.get(column) and value is not None:
+                cell += f' ({(value - previous[column]) / previous[column] * 100:+.0f}%)'
+            cells.append(f'{cell:>24}')
+        lines.append(f'{name:<12}' + ''.join(cells))
+    return '\n'.join(lines)
@@ -0,0 +1,58 @@
+import asyncio
+from statistics import mean, quantiles
+from time import perf_counter
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+async def run_scenario(scenario, ctx, requests: int, concurrency: int, warmup: int) -> dict:
+    """
+    Выполняет requests вызовов сценария, одновременно работают concurrency клиентов.
+    У каждого клиента свой генератор случайных чисел с seed (ctx.seed, номер клиента).
+    Ошибки (исключения и неожиданные статусы) учитываются отдельно и не входят в задержки.
+    """
+    warmup_random = ctx.worker_random('warmup')
+    for i in range(warmup):
+        await scenario(ctx, warmup_random, -i - 1)
+
+    latencies, queries, errors = [], [], []
+    counter = iter(range(requests))
+
+    async def worker(rng):
+        for i in counter:
+            try:
+                response = await scenario(ctx, rng, i)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            latencies.append(response.elapsed)
+            queries.append(response.queries)
+
+    start = perf_counter()
+    await asyncio.gather(*(worker(ctx.worker_random(number)) for number in range(concurrency)))
+    duration = perf_counter() - start
+
+    result = {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': len(errors),
+        'duration_s': duration,
+        'throughput_rps': len(latencies) / duration if duration else 0.0,
+    }
+    if latencies:
+        latencies_ms = [value * 1000 for value in latencies]
+        result.update({
+            'p50_ms': percentile(latencies_ms, 50),
+            'p95_ms': percentile(latencies_ms, 95),
+            'p99_ms': percentile(latencies_ms, 99),
+            'mean_ms': mean(latencies_ms),
+            'max_ms': max(latencies_ms),
+            'db_queries_per_request': mean(queries),
+        })
+    if errors:
+        result['first_error'] = errors[0]
+    return result
@@ -0,0 +1,91 @@
+import random
+from uuid import uuid4
+from .client import ASGIClient, Response
+
+
+BENCH_EMAIL = 'loadtest@example.com'
+BENCH_PASSWORD = 'loadtest-password'
+
+
+class Context:
+    """
+    Общие данные сценариев: авторизованный клиент, ID опубликованных блогов и seed.
+    ctx.random используется только при подготовке, сценарии получают генератор своего клиента.
+    """
+
+    def __init__(self, app, seed: int):
+        self.app = app
+        self.anonymous = ASGIClient(app)
+        self.user: ASGIClient | None = None
+        self.blog_ids: list[int] = []
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.run_id = uuid4().hex[:8]
+
+    def worker_random(self, worker: int | str) -> random.Random:
+        """Генератор клиента: последовательность не зависит от того, как чередуются клиенты."""
+        return random.Random(f'{self.seed}:{worker}')
+
+
+def check(response: Response, *statuses: int) -> Response:
+    if response.status not in statuses:
+        raise RuntimeError(f'Неожиданный статус {response.status}: {response.body[:200]!r}')
+    return response
+
+
+async def setup(ctx: Context, min_blogs: int = 20) -> None:
+    """
+    Регистрирует (если нужно) пользователя нагрузочного теста, авторизуется и собирает ID блогов.
+    Если опубликованных блогов меньше min_blogs, недостающие создаются через /api/add_post.
+    """
+    check(await ctx.anonymous.post('/auth/register', {
+        'email': BENCH_EMAIL, 'password_hash': BENCH_PASSWORD,
+        'username': 'loadtest', 'first_name': 'Load', 'last_name': 'Test',
+    }), 200, 409)
+    login = check(await ctx.anonymous.post('/auth/login', {'email': BENCH_EMAIL, 'password_hash': BENCH_PASSWORD}), 200)
+    ctx.user = ASGIClient(ctx.app, cookies={'user_access_token': login.cookies['user_access_token']})
+
+    for i in range(min_blogs):
+        ctx.blog_ids = await _published_ids(ctx)
+        if len(ctx.blog_ids) >= min_blogs:
+            break
+        await add_post(ctx, ctx.random, i)
+    ctx.blog_ids = await _published_ids(ctx)
+    if not ctx.blog_ids:
+        raise RuntimeError('Нет опубликованных блогов для сценария blog_page')
+
+
+async def _published_ids(ctx: Context) -> list[int]:
+    response = check(await ctx.anonymous.get('/api/blogs', {'page_size': 100, 'view': 'summary',
+                                                            'fields': 'id'}), 200)
+    return [blog['id'] for blog in response.json()['blogs']]
+
+
+async def blogs_list(ctx: Context, rng: random.Random, i: int) -> Response:
+    return check(await ctx.anonymous.get('/api/blogs', {'page': rng.randint(1, 5), 'page_size': 10}), 200)
+
+
+async def blog_page(ctx: Context, rng: random.Random, i: int) -> Response:
+    return check(await ctx.anonymous.get(f'/blogs/{rng.choice(ctx.blog_ids)}/'), 200)
+
+
+async def add_post(ctx: Context, rng: random.Random, i: int) -> Response:
+    tags = rng.sample(['python', 'fastapi', 'postgres', 'asyncio', 'sqlalchemy', 'benchmark'], k=2)
+    return check(await ctx.user.post('/api/add_post', {
+        'title': f'Нагрузочный тест {ctx.run_id}-{i}',
+        'content': '## Заголовок\n\nТекст блога в формате **Markdown**.\n' * 20,
+        'short_description': 'Блог, созданный нагрузочным тестом',
+        'tags': tags,
+    }), 200)
+
+
+async def login(ctx: Context, rng: random.Random, i: int) -> Response:
+    return check(await ctx.anonymous.post('/auth/login', {'email': BENCH_EMAIL, 'password_hash': BENCH_PASSWORD}), 200)
+
+
+SCENARIOS = {
+    'blogs_list': blogs_list,
+    'blog_page': blog_page,
+    'add_post': add_post,
+    'login': login,
+}
@@ -0,0 +1,94 @@
+"""
+Накладные расходы логирования на HTTP-запрос без БД.
+
+Приложение FastAPI с одним маршрутом, который пишет в лог столько же сообщений, сколько
+типичный запрос списка блогов через DAO (поиск, подсчет, страница с фильтрами).
+Запросы выполняются напрямую через ASGI-интерфейс, лог пишется в файл.
+
+off:      уровень WARNING, сообщения DAO отбрасываются до форматирования;
+sync:     StreamHandler в потоке event loop (как logging.basicConfig);
+queue:    QueueHandler/QueueListener; маскирование и getMessage() выполняются в prepare в потоке event loop,
+          в отдельном потоке - только форматирование по LOG_FORMAT и запись;
+sampled:  queue + LOG_SAMPLING app.dao=0.1.
+
+    python -m benchmarks.logging_overhead --requests 2000 --messages 8
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+from statistics import quantiles
+from time import perf_counter
+from fastapi import FastAPI
+from app.logger import dao_logger, setup_logging, shutdown_logging
+
+
+MODES = {
+    'off': {'level': 'WARNING', 'queue_enabled': False, 'sampling': {}},
+    'sync': {'level': 'INFO', 'queue_enabled': False, 'sampling': {}},
+    'queue': {'level': 'INFO', 'queue_enabled': True, 'sampling': {}},
+    'sampled': {'level': 'INFO', 'queue_enabled': True, 'sampling': {'app.dao': 0.1}},
+}
+
+
+def create_app(messages: int) -> FastAPI:
+    app = FastAPI()
+    filters = {'author': 1, 'status': 'published', 'password_hash': 'x' * 60}
+
+    @app.get('/blogs')
+    async def blogs():
+        for i in range(messages):
+            dao_logger.info('Поиск всех записей %s по фильтрам: %s', 'Blog', filters)
+        return {'blogs': []}
+
+    return app
+
+
+async def call(app: FastAPI) -> None:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': '/blogs', 'raw_path': b'/blogs', 'query_string': b'',
+        'root_path': '', 'headers': [], 'client': ('127.0.0.1', 1), 'server': ('127.0.0.1', 80),
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app: FastAPI, requests: int) -> list[float]:
+    for _ in range(100):
+        await call(app)
+    timings = []
+    for _ in range(requests):
+        start = perf_counter()
+        await call(app)
+        timings.append((perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.logging_overhead')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--messages', type=int, default=8, help='Сообщений DAO на запрос')
+    args = parser.parse_args()
+
+    app = create_app(args.messages)
+    baseline = None
+    with tempfile.TemporaryFile('w') as stream:
+        for name, options in MODES.items():
+            setup_logging(stream=stream, **options)
+            timings = asyncio.run(measure(app, args.requests))
+            shutdown_logging()
+            p50, p95 = (quantiles(timings, n=100)[index] for index in (49, 94))
+            baseline = baseline or p50
+            print(f'{name:<8} p50 {p50:8.1f} мкс  p95 {p95:8.1f} мкс  (+{p50 - baseline:.1f} мкс к off)')
+    logging.getLogger().handlers.clear()
+
+
+if __name__ == '__main__':
+    main()
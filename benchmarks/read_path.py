@@ -0,0 +1,81 @@
+"""
+Сравнение путей чтения BlogDAO: ORM (гидратация объектов + model_validate)
+и Core (строки с тегами, агрегированными в SQL через json_agg).
+
+Для каждого пути измеряются время ответа и процессорное время на запрос
+(time.process_time), включая сериализацию ответа в JSON, как в эндпоинтах.
+Нужна PostgreSQL с данными, параметры подключения берутся из .env.
+
+    python -m benchmarks.read_path --iterations 500 --page-size 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from fastapi.encoders import jsonable_encoder
+from app.database.db import AsyncSession, engine
+from app.auth.schemas import User  # регистрирует модель User для связи Blog.user
+from app.api.dao import BlogDAO
+from app.api.models import MBlogFullResponse
+
+
+async def list_page(args: argparse.Namespace, blog_id: int) -> None:
+    async with AsyncSession() as db:
+        result = await BlogDAO.get_list_blog(db=db, page=1, page_size=args.page_size, view=args.view)
+    json.dumps(jsonable_encoder(result))
+
+
+async def blog_detail(args: argparse.Namespace, blog_id: int) -> None:
+    async with AsyncSession() as db:
+        blog = await BlogDAO.get_full_blog_info(db=db, blog_id=blog_id)
+    MBlogFullResponse.model_validate(blog).model_dump_json()
+
+
+async def measure(scenario, args: argparse.Namespace, blog_id: int) -> dict:
+    for _ in range(args.warmup):
+        await scenario(args, blog_id)
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    for _ in range(args.iterations):
+        await scenario(args, blog_id)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    return {
+        'wall_ms': wall / args.iterations * 1000,
+        'cpu_ms': cpu / args.iterations * 1000,
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    BlogDAO.read_path = 'orm'
+    async with AsyncSession() as db:
+        first_page = await BlogDAO.get_list_blog(db=db, page=1, page_size=1)
+    if not first_page['blogs']:
+        raise SystemExit('В базе нет опубликованных блогов')
+    blog_id = args.blog_id or first_page['blogs'][0].id
+
+    print(f'{"сценарий":<10} {"путь":<5} {"wall, мс":>10} {"cpu, мс":>10}')
+    for name, scenario in (('list', list_page), ('detail', blog_detail)):
+        results = {}
+        for read_path in ('orm', 'core'):
+            BlogDAO.read_path = read_path
+            results[read_path] = await measure(scenario, args, blog_id)
+            print(f'{name:<10} {read_path:<5} {results[read_path]["wall_ms"]:>10.3f} '
+                  f'{results[read_path]["cpu_ms"]:>10.3f}')
+        print(f'{name:<10} cpu core/orm: {results["core"]["cpu_ms"] / results["orm"]["cpu_ms"]:.2f}')
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.read_path')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--view', choices=('full', 'summary'), default='full')
+    parser.add_argument('--blog-id', type=int, default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Микробенчмарк сериализации страницы ленты без БД.
+
+before: model_validate на каждый блог + jsonable_encoder + json.dumps (JSONResponse);
+after:  пакетная валидация TypeAdapter + сериализация pydantic-core (FastJSONResponse).
+
+    python -m benchmarks.serialization --page-size 50 --repeat 200
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.api.models import MBlogFullResponse, blog_list_adapter
+from app.responses import FastJSONResponse
+
+
+def make_blogs(count: int, content_size: int) -> list[SimpleNamespace]:
+    """Объекты с атрибутами как у ORM-модели Blog."""
+    created_at = datetime(2025, 1, 1)
+    author = SimpleNamespace(id=1, first_name='Иван', last_name='Петров')
+    return [
+        SimpleNamespace(
+            id=i,
+            author=author.id,
+            title=f'Заголовок блога {i}',
+            content='Текст блога в формате **Markdown**. ' * (content_size // 36),
+            short_description='Краткое описание блога',
+            created_at=created_at + timedelta(minutes=i),
+            status='published',
+            tags=[SimpleNamespace(id=tag_id, name=f'тег{tag_id}') for tag_id in range(i % 5)],
+            user=author,
+        )
+        for i in range(count)
+    ]
+
+
+def page(blogs: list) -> dict:
+    return {'page': 1, 'total_page': 10, 'total_result': 100, 'blogs': blogs, 'next_cursor': None, 'prev_cursor': None}
+
+
+def before(objects: list) -> bytes:
+    blogs = [MBlogFullResponse.model_validate(blog) for blog in objects]
+    return JSONResponse(jsonable_encoder(page(blogs))).body
+
+
+def after(objects: list) -> bytes:
+    blogs = blog_list_adapter.validate_python(objects, from_attributes=True)
+    return FastJSONResponse(page(blogs)).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serialization')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--content-size', type=int, default=2000, help='Размер content в символах')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    objects = make_blogs(args.page_size, args.content_size)
+    results = {}
+    for name, fn in (('before', before), ('after', after)):
+        fn(objects)
+        results[name] = min(timeit.repeat(lambda: fn(objects), number=1, repeat=args.repeat)) * 1000
+        print(f'{name:<7} {results[name]:8.3f} мс на страницу ({args.page_size} блогов)')
+    print(f'ускорение: {results["before"] / results["after"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""add blogs keyset index
+
+Revision ID: 3b8f2c1d9e47
+Revises: fde328f1aa92
+Create Date: 2026-10-18 10:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8f2c1d9e47'
+down_revision: Union[str, None] = 'fde328f1aa92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Индекс строится CONCURRENTLY вне транзакции миграции, без блокировки записи в blogs.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_blogs_status_created_at_id', 'blogs', ['status', 'created_at', 'id'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_blogs_status_created_at_id', table_name='blogs', postgresql_concurrently=True)
@@ -0,0 +1,72 @@
+"""add blogs search vector
+
+Revision ID: b52f0e7a4d91
+Revises: 9d4a6e2b8c15
+Create Date: 2026-10-18 13:40:52.631087
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52f0e7a4d91'
+down_revision: Union[str, None] = '9d4a6e2b8c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce({row}short_description, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce({row}content, '')), 'C')"
+)
+# Строк в одной транзакции заполнения: блокировки строк держатся недолго, таблица доступна для записи
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    # Колонка без значения по умолчанию добавляется без перезаписи таблицы, в отличие от STORED-колонки
+    op.add_column('blogs', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    # Новые и измененные строки получают вектор в триггере сразу, до заполнения старых
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION blogs_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_EXPRESSION.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER blogs_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, short_description, content ON blogs
+        FOR EACH ROW EXECUTE FUNCTION blogs_search_vector_update()
+    """)
+
+    # Существующие строки заполняются пакетами по диапазонам id, каждый пакет - отдельная транзакция.
+    # GIN-индекс строится CONCURRENTLY, без блокировки записи в blogs.
+    backfill = (f"UPDATE blogs SET search_vector = {SEARCH_VECTOR_EXPRESSION.format(row='')} "
+                "WHERE search_vector IS NULL")
+    with op.get_context().autocommit_block():
+        if context.is_offline_mode():
+            # В SQL-скрипте (--sql) размер таблицы неизвестен, заполнение одним запросом
+            op.execute(backfill)
+        else:
+            bind = op.get_bind()
+            max_id = bind.execute(sa.text('SELECT max(id) FROM blogs')).scalar() or 0
+            for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+                bind.execute(sa.text(f'{backfill} AND id > :start AND id <= :stop'),
+                             {'start': start, 'stop': start + BACKFILL_BATCH_SIZE})
+        op.create_index('ix_blogs_search_vector', 'blogs', ['search_vector'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_blogs_search_vector', table_name='blogs', postgresql_concurrently=True)
+    op.execute('DROP TRIGGER IF EXISTS blogs_search_vector_update ON blogs')
+    op.execute('DROP FUNCTION IF EXISTS blogs_search_vector_update()')
+    op.drop_column('blogs', 'search_vector')
@@ -0,0 +1,36 @@
+"""add tag filter indexes
+
+Revision ID: c8e3d1f6a2b4
+Revises: b52f0e7a4d91
+Create Date: 2026-10-18 14:55:16.208843
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e3d1f6a2b4'
+down_revision: Union[str, None] = 'b52f0e7a4d91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.create_index('ix_blogtags_tag_id_blog_id', 'blogtags', ['tag_id', 'blog_id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_tags_name_pattern', 'tags', ['name'], unique=False,
+                        postgresql_ops={'name': 'varchar_pattern_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_tags_name_trgm', 'tags', ['name'], unique=False, postgresql_using='gin',
+                        postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tags_name_trgm', table_name='tags', postgresql_concurrently=True)
+        op.drop_index('ix_tags_name_pattern', table_name='tags', postgresql_concurrently=True)
+        op.drop_index('ix_blogtags_tag_id_blog_id', table_name='blogtags', postgresql_concurrently=True)
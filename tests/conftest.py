@@ -0,0 +1,112 @@
+import os
+import tempfile
+import pytest
+
+# Настройки читаются при импорте app.config, поэтому задаются до импорта приложения.
+# По умолчанию используется SQLite; TEST_DATABASE_URL позволяет запустить тесты на PostgreSQL.
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL') or \
+    f'sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix="mini_blog_tests_"), "test.db")}'
+os.environ.update({
+    'DATABASE_URL': TEST_DATABASE_URL,
+    'SECRET_KEY': 'test-secret-key',
+    'ALGORITHM': 'HS256',
+    'BCRYPT_ROUNDS': '4',
+    'LOG_QUEUE_ENABLED': 'false',
+    'DB_POOL_WARMUP': '0',
+    'RESPONSE_CACHE_BACKEND': 'memory',
+    # Core-путь чтения использует json_agg PostgreSQL, он проверяется отдельно (test_read_path)
+    'BLOG_READ_PATH': 'orm',
+})
+
+import httpx
+from sqlalchemy import text
+from app.main import app
+from app.database.db import Base, engine, AsyncSession
+from app.auth.schemas import User, Role
+from app.auth.auth import get_password_hash
+from app.auth.cache import invalidate_all_users, token_cache
+from app.api.schemas import Blog
+from app.api.dao import BlogDAO
+from app.api.tag_index import tag_index
+from app.response_cache import response_cache
+
+
+IS_SQLITE = engine.dialect.name == 'sqlite'
+PASSWORD = 'password123'
+
+if IS_SQLITE:
+    # Вычисляемая колонка tsvector и GIN-индекс есть только в PostgreSQL
+    blogs_table = Blog.__table__
+    for index in list(blogs_table.indexes):
+        if index.name == 'ix_blogs_search_vector':
+            blogs_table.indexes.discard(index)
+    blogs_table._columns.remove(blogs_table.c.search_vector)
+
+
+@pytest.fixture(scope='session')
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture(autouse=True)
+async def database(anyio_backend):
+    """Чистая схема и пустые кэши приложения для каждого теста."""
+    async with engine.begin() as conn:
+        if not IS_SQLITE:
+            await conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession() as db:
+        db.add_all([Role(id=1, name='user'), Role(id=2, name='admin')])
+        await db.commit()
+
+    BlogDAO.invalidate_counts()
+    invalidate_all_users()
+    token_cache.clear()
+    tag_index.postings, tag_index.ready = {}, False
+    if response_cache is not None:
+        await response_cache.clear()
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db():
+    async with AsyncSession() as session:
+        yield session
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver') as client:
+        yield client
+
+
+async def create_user(email: str = 'author@example.com', role_id: int = 1) -> User:
+    async with AsyncSession() as db:
+        user = User(username=email.split('@')[0], email=email, password_hash=get_password_hash(PASSWORD),
+                    first_name='Иван', last_name='Петров', role_id=role_id)
+        db.add(user)
+        await db.commit()
+        await db.refresh(user, ['roles'])
+        return user
+
+
+async def login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    response = await client.post('/auth/login', json={'email': email, 'password_hash': PASSWORD})
+    assert response.status_code == 200
+    return response
+
+
+async def create_blog(author_id: int, title: str = 'Блог', status: str = 'published',
+                      tags: list[str] = ()) -> int:
+    from app.api.dao import TagDAO, BlogTagDAO
+    async with AsyncSession() as db:
+        async with BlogDAO.transaction(db):
+            blog = await BlogDAO.add(data={'title': title, 'author': author_id, 'short_description': 'Описание',
+                                           'content': '# Заголовок', 'status': status}, db=db)
+            if tags:
+                tag_ids = await TagDAO.add_tags(db=db, tag_names=list(tags))
+                await BlogTagDAO.add_blog_tags(db=db, blog_tag_pairs=[{'blog_id': blog.id, 'tag_id': tag_id}
+                                                                      for tag_id in tag_ids])
+        return blog.id
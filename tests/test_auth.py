@@ -0,0 +1,89 @@
+import pytest
+from app.auth import auth
+from app.auth.auth import create_access_token, decode_token, get_user_from_payload
+from app.auth.models import MTokenUser
+from app.auth.cache import user_cache, user_cache_enabled
+from .conftest import create_user, login
+
+
+pytestmark = pytest.mark.anyio
+
+
+def cookie(name: str, value: str) -> dict:
+    return {'Cookie': f'{name}={value}'}
+
+
+async def test_login_issues_access_and_refresh_tokens(client):
+    user = await create_user()
+    tokens = (await login(client, user.email)).json()
+
+    assert decode_token(tokens['access_token'])['type'] == 'access'
+    assert decode_token(tokens['refresh_token'])['type'] == 'refresh'
+    me = await client.get('/auth/me', headers=cookie('user_access_token', tokens['access_token']))
+    assert me.json()['id'] == user.id
+
+
+async def test_refresh_returns_new_token_pair(client):
+    user = await create_user()
+    tokens = (await login(client, user.email)).json()
+
+    response = await client.post('/auth/refresh', headers=cookie('user_refresh_token', tokens['refresh_token']))
+    assert response.status_code == 200
+    assert decode_token(response.json()['access_token'])['sub'] == str(user.id)
+
+
+async def test_access_token_is_not_accepted_as_refresh_token(client):
+    user = await create_user()
+    tokens = (await login(client, user.email)).json()
+
+    response = await client.post('/auth/refresh', headers=cookie('user_refresh_token', tokens['access_token']))
+    assert response.status_code == 401
+
+
+async def test_revoke_invalidates_issued_tokens(client):
+    user = await create_user()
+    tokens = (await login(client, user.email)).json()
+
+    response = await client.post('/auth/revoke', headers=cookie('user_access_token', tokens['access_token']))
+    assert response.status_code == 200
+
+    # Версия токенов увеличена: старые refresh- и (в режиме db) access-токены не принимаются
+    refresh = await client.post('/auth/refresh', headers=cookie('user_refresh_token', tokens['refresh_token']))
+    assert refresh.status_code == 401
+    me = await client.get('/auth/me', headers=cookie('user_access_token', tokens['access_token']))
+    assert me.json() is None
+
+    # Новый вход выдает токены с новой версией
+    new_tokens = (await login(client, user.email)).json()
+    me = await client.get('/auth/me', headers=cookie('user_access_token', new_tokens['access_token']))
+    assert me.json()['id'] == user.id
+
+
+async def test_stateless_mode_restores_user_from_claims_without_db(monkeypatch, db):
+    user = await create_user()
+    payload = decode_token(create_access_token(user))
+    monkeypatch.setattr(auth, 'AUTH_MODE', 'stateless')
+
+    async def fail(*args, **kwargs):
+        raise AssertionError('в режиме stateless пользователь не загружается из БД')
+
+    monkeypatch.setattr(auth.UserDAO, 'find_one_or_none_by_id', fail)
+    restored = await get_user_from_payload(payload, db)
+    assert isinstance(restored, MTokenUser)
+    assert (restored.id, restored.first_name, restored.token_version) == (user.id, user.first_name, 0)
+
+
+async def test_me_returns_the_full_user_with_user_cache(client):
+    assert user_cache_enabled()
+    user = await create_user()
+    await login(client, user.email)
+
+    # Первый запрос кладет пользователя в кэш, второй получает его из кэша
+    for _ in range(2):
+        me = (await client.get('/auth/me')).json()
+        assert {'id', 'email', 'username', 'first_name', 'last_name', 'role_id', 'roles',
+                'token_version', 'created_at', 'updated_at'} <= set(me)
+        assert me['email'] == user.email
+        assert me['username'] == user.username
+        assert me['roles']['name'] == 'user'
+    assert user_cache.get(user.id) is not None
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from app.base_dao import BaseDAO
+from app.auth.dao import UserDAO
+from app.auth.schemas import User
+from app.api.dao import BlogDAO
+from app.api.schemas import Blog
+from app.api.render import RENDERER_VERSION, is_rendered
+from .conftest import create_user
+
+
+pytestmark = pytest.mark.anyio
+
+
+def user_data(username: str, email: str) -> dict:
+    return {'username': username, 'email': email, 'password_hash': 'hash', 'first_name': 'Иван', 'last_name': 'Петров'}
+
+
+async def count_users(db, email: str) -> int:
+    return await db.scalar(select(func.count(User.id)).where(User.email == email))
+
+
+async def test_failed_add_outside_transaction_rolls_back(db):
+    await create_user('first@example.com')
+
+    with pytest.raises(IntegrityError):
+        # username 'first' уже занят
+        await UserDAO.add(user_data('first', 'second@example.com'), db=db)
+
+    assert not db.in_transaction()
+    assert await count_users(db, 'second@example.com') == 0
+    # Сессия пригодна для дальнейшей работы
+    await UserDAO.add(user_data('second', 'second@example.com'), db=db)
+    assert await count_users(db, 'second@example.com') == 1
+
+
+async def test_failed_add_inside_transaction_rolls_back_whole_unit_of_work(db):
+    author = await create_user('first@example.com')
+
+    with pytest.raises(IntegrityError):
+        async with BaseDAO.transaction(db):
+            await BlogDAO.add(data={'title': 'Откатится', 'author': author.id, 'short_description': 's',
+                                    'content': 'text'}, db=db)
+            await UserDAO.add(user_data('first', 'second@example.com'), db=db)
+
+    assert not BaseDAO.in_transaction(db)
+    assert not db.in_transaction()
+    assert await db.scalar(select(func.count(Blog.id)).where(Blog.title == 'Откатится')) == 0
+    assert await count_users(db, 'second@example.com') == 0
+
+    async with BaseDAO.transaction(db):
+        await UserDAO.add(user_data('second', 'second@example.com'), db=db)
+    assert await count_users(db, 'second@example.com') == 1
+
+
+async def test_nested_transaction_joins_outer_scope(db):
+    author = await create_user('first@example.com')
+
+    async with BaseDAO.transaction(db):
+        async with BaseDAO.transaction(db):
+            await BlogDAO.add(data={'title': 'Вложенный', 'author': author.id, 'short_description': 's',
+                                    'content': 'text'}, db=db)
+        # Вложенный блок не фиксирует транзакцию
+        assert BaseDAO.in_transaction(db)
+        await db.rollback()
+
+    assert await db.scalar(select(func.count(Blog.id)).where(Blog.title == 'Вложенный')) == 0
+
+
+async def test_new_blog_keeps_render_version_regardless_of_kwargs_order(db):
+    author = await create_user('first@example.com')
+    blog = Blog(
+        title='Заголовок', short_description='Описание', author=author.id, content_html='<p>Текст</p>',
+        content_html_version=RENDERER_VERSION, content='Текст'
+    )
+    assert is_rendered(blog)
+
+    db.add(blog)
+    await db.commit()
+    assert is_rendered(blog)
+
+    blog.content = 'Новый текст'
+    assert not is_rendered(blog)
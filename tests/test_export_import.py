@@ -0,0 +1,90 @@
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from .conftest import create_user, create_blog, login
+
+
+pytestmark = pytest.mark.anyio
+
+
+def parse_ndjson(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+async def export(client, **params) -> list[dict]:
+    response = await client.get('/api/export', params=params)
+    assert response.status_code == 200
+    return parse_ndjson(response.text)
+
+
+async def test_export_accepts_timezone_aware_updated_since(client):
+    admin = await create_user('admin@example.com', role_id=2)
+    await create_blog(admin.id, title='Первый')
+    await login(client, admin.email)
+
+    now = datetime.now(timezone.utc)
+    # Та же точка во времени в другом часовом поясе: сравнение должно идти в UTC
+    hour_ago = (now - timedelta(hours=1)).astimezone(timezone(timedelta(hours=5)))
+    in_an_hour = (now + timedelta(hours=1)).astimezone(timezone(timedelta(hours=-5)))
+
+    assert [blog['title'] for blog in await export(client, updated_since=hour_ago.isoformat())] == ['Первый']
+    assert await export(client, updated_since=in_an_hour.isoformat()) == []
+
+
+async def import_ndjson(client, lines: list, **params):
+    body = '\n'.join(line if isinstance(line, str) else json.dumps(line, ensure_ascii=False) for line in lines)
+    return await client.post('/api/import', params=params, content=body.encode(),
+                             headers={'Content-Type': 'application/x-ndjson'})
+
+
+async def test_import_reports_bad_lines_and_keeps_valid_rows(client):
+    admin = await create_user('admin@example.com', role_id=2)
+    await login(client, admin.email)
+
+    response = await import_ndjson(client, [
+        {'title': 'Первый', 'content': 'Текст', 'short_description': 'Описание', 'author': admin.id,
+         'tags': ['python']},
+        '{not json',
+        {'title': 'Чужой', 'content': 'Текст', 'short_description': 'Описание', 'author': 999},
+        '',
+        {'title': 'Второй', 'content': 'Текст', 'short_description': 'Описание', 'author': admin.id},
+        {'content': 'Без заголовка', 'short_description': 'Описание', 'author': admin.id},
+    ], batch_size=2)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report['imported'] == 2
+    assert report['failed'] == 3
+    assert [error['line'] for error in report['errors']] == [2, 3, 6]
+
+    blogs = (await client.get('/api/blogs')).json()['blogs']
+    assert {blog['title'] for blog in blogs} == {'Первый', 'Второй'}
+
+
+async def test_export_import_round_trip(client):
+    admin = await create_user('admin@example.com', role_id=2)
+    await create_blog(admin.id, title='Первый', tags=['python', 'asyncio'])
+    await create_blog(admin.id, title='Второй')
+    await login(client, admin.email)
+
+    exported = await export(client)
+    for blog in exported:
+        blog['title'] += ' (копия)'
+    response = await import_ndjson(client, exported)
+    assert response.json() == {'imported': 2, 'failed': 0, 'errors': []}
+
+    copies = {blog['title']: blog for blog in await export(client) if blog['title'].endswith('(копия)')}
+    assert {name: {tag['name'] for tag in blog['tags']} for name, blog in copies.items()} == {
+        'Первый (копия)': {'python', 'asyncio'},
+        'Второй (копия)': set(),
+    }
+
+
+async def test_export_and_import_require_an_administrator(client):
+    user = await create_user()
+    assert (await client.get('/api/export')).status_code == 401
+    assert (await import_ndjson(client, [])).status_code == 401
+
+    await login(client, user.email)
+    assert (await client.get('/api/export')).status_code == 403
+    assert (await import_ndjson(client, [])).status_code == 403
@@ -0,0 +1,96 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import event, update
+from app.api.dao import BlogDAO
+from app.api.schemas import Blog
+from app.database.db import engine, AsyncSession
+from .conftest import create_user, create_blog, login
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def statements():
+    """SQL-запросы, выполненные за время теста."""
+    executed = []
+
+    def on_execute(conn, cursor, statement, *args):
+        executed.append(statement.lower())
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', on_execute)
+    yield executed
+    event.remove(engine.sync_engine, 'before_cursor_execute', on_execute)
+
+
+@pytest.mark.parametrize('path', ['/api/blogs', '/blogs/'])
+async def test_feed_revalidation_reads_only_the_page(client, statements, path):
+    author = await create_user()
+    for number in range(3):
+        await create_blog(author.id, title=f'Блог {number}')
+
+    response = await client.get(path)
+    assert response.status_code == 200
+    etag = response.headers['etag']
+
+    statements.clear()
+    response = await client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    # Валидатор читает строки страницы и не считает всю ленту
+    assert statements and not any('count(' in statement for statement in statements)
+
+
+async def test_feed_etag_changes_after_new_post(client):
+    author = await create_user()
+    await create_blog(author.id, title='Первый')
+    etag = (await client.get('/api/blogs')).headers['etag']
+
+    await login(client, author.email)
+    response = await client.post('/api/add_post', json={'title': 'Второй', 'content': 'Текст',
+                                                         'short_description': 'Описание'})
+    assert response.status_code == 200
+
+    response = await client.get('/api/blogs', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+    assert [blog['title'] for blog in response.json()['blogs']] == ['Второй', 'Первый']
+
+
+async def test_feed_etag_changes_when_page_blog_is_unpublished(client):
+    author = await create_user()
+    blog_id = await create_blog(author.id, title='Первый')
+    await create_blog(author.id, title='Второй')
+    etag = (await client.get('/api/blogs')).headers['etag']
+
+    await login(client, author.email)
+    response = await client.patch(f'/api/change_blog_status/{blog_id}', params={'new_status': 'draft'})
+    assert response.status_code == 200
+
+    response = await client.get('/api/blogs', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+
+
+async def test_feed_validators_change_when_another_page_changes(client, monkeypatch):
+    author = await create_user()
+    oldest = await create_blog(author.id, title='Блог 0')
+    for number in range(1, 11):
+        await create_blog(author.id, title=f'Блог {number}')
+    # Блоги и версия ленты старше удаления, чтобы If-Modified-Since не совпал с ним по секундам
+    async with AsyncSession() as db:
+        await db.execute(update(Blog).values(updated_at=datetime(2020, 1, 1)))
+        await db.commit()
+    monkeypatch.setattr(BlogDAO, 'feed_changed_at', datetime(2020, 1, 1))
+
+    first = await client.get('/api/blogs')
+    assert first.json()['total_result'] == 11
+
+    # Удаляется блог со второй страницы: строки первой страницы не меняются
+    await login(client, author.email)
+    assert (await client.delete(f'/api/delete_blog/{oldest}')).status_code == 200
+
+    for headers in ({'If-None-Match': first.headers['etag']},
+                    {'If-Modified-Since': first.headers['last-modified']}):
+        response = await client.get('/api/blogs', headers=headers)
+        assert response.status_code == 200
+        assert response.json()['total_result'] == 10
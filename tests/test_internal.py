@@ -0,0 +1,27 @@
+import pytest
+from .conftest import create_user, login
+
+
+pytestmark = pytest.mark.anyio
+
+INTERNAL_PATHS = ('/internal/pool', '/internal/caches', '/internal/tag_index', '/internal/singleflight')
+
+
+@pytest.mark.parametrize('path', INTERNAL_PATHS)
+async def test_internal_endpoints_require_authentication(client, path):
+    response = await client.get(path)
+    assert response.status_code == 401
+
+
+async def test_internal_endpoints_are_forbidden_for_regular_users(client):
+    user = await create_user()
+    await login(client, user.email)
+    for path in INTERNAL_PATHS:
+        assert (await client.get(path)).status_code == 403
+
+
+async def test_internal_endpoints_are_available_to_admins(client):
+    admin = await create_user('admin@example.com', role_id=2)
+    await login(client, admin.email)
+    for path in INTERNAL_PATHS:
+        assert (await client.get(path)).status_code == 200
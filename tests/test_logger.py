@@ -0,0 +1,53 @@
+import io
+import logging
+import queue
+import pytest
+from app.logger import LazyQueueHandler, RedactingFilter, setup_logging, shutdown_logging
+from app.database.db import get_engine_options
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    setup_logging(stream=stream, level='INFO', queue_enabled=True, sampling={'tests.sampled': 0})
+    yield stream
+    setup_logging(queue_enabled=False)
+
+
+def read_log(stream: io.StringIO) -> str:
+    shutdown_logging()
+    return stream.getvalue()
+
+
+def test_queue_handler_redacts_and_formats_before_enqueue():
+    log_queue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue, redactor=RedactingFilter(['password_hash']))
+    data = {'email': 'user@example.com', 'password_hash': 'secret-hash'}
+    record = logging.LogRecord('tests', logging.INFO, __file__, 1, 'Пользователь %s', (data,), None)
+
+    handler.handle(record)
+    data['email'] = 'changed@example.com'
+
+    queued = log_queue.get_nowait()
+    assert queued.args is None and queued.exc_info is None
+    assert queued.getMessage() == "Пользователь {'email': 'user@example.com', 'password_hash': '***'}"
+    # Исходная запись не меняется: ее могут обрабатывать другие обработчики
+    assert record.args['password_hash'] == 'secret-hash'
+
+
+def test_queued_log_keeps_traceback_and_applies_sampling(log_stream):
+    try:
+        raise ValueError('ошибка')
+    except ValueError:
+        logging.getLogger('tests').exception('Не удалось: %s', {'password_hash': 'secret-hash'})
+    logging.getLogger('tests.sampled').info('отброшено')
+
+    output = read_log(log_stream)
+    assert "ERROR:tests:Не удалось: {'password_hash': '***'}" in output
+    assert 'ValueError: ошибка' in output
+    assert 'secret-hash' not in output
+    assert 'отброшено' not in output
+
+
+def test_engine_hides_statement_parameters():
+    assert get_engine_options()['hide_parameters'] is True
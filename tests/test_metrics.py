@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+import app.internal.metrics as metrics_endpoint
+from app.api.dao import BlogDAO
+from app.metrics import db_queries_total, db_query_duration, RequestDBStats, current_request_db, current_dao_method
+from .conftest import create_user, create_blog, login
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_metrics_require_an_administrator(client):
+    assert (await client.get('/metrics')).status_code == 401
+
+    user = await create_user()
+    await login(client, user.email)
+    assert (await client.get('/metrics')).status_code == 403
+
+
+async def test_metrics_are_available_to_admins(client):
+    admin = await create_user('admin@example.com', role_id=2)
+    await login(client, admin.email)
+
+    response = await client.get('/metrics')
+    assert response.status_code == 200
+    assert '# TYPE db_queries_total counter' in response.text
+
+
+async def test_metrics_accept_the_scrape_token(client, monkeypatch):
+    monkeypatch.setattr(metrics_endpoint, 'METRICS_TOKEN', 'scrape-token')
+
+    assert (await client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'})).status_code == 200
+    assert (await client.get('/metrics', headers={'Authorization': 'Bearer wrong'})).status_code == 401
+
+
+async def connection_info(db) -> dict:
+    connection = await db.connection()
+    return {key: repr(value) for key, value in (await connection.get_raw_connection()).info.items()}
+
+
+async def test_failed_statement_leaves_no_timing_state(db):
+    info = await connection_info(db)
+    for _ in range(3):
+        with pytest.raises(SQLAlchemyError):
+            await db.execute(text('SELECT * FROM missing_table'))
+        await db.rollback()
+
+    assert await connection_info(db) == info
+
+    queries, observed = db_queries_total.total(), db_query_duration._values[('none',)][2]
+    await db.execute(text('SELECT 1'))
+    assert db_queries_total.total() == queries + 1
+    assert db_query_duration._values[('none',)][2] == observed + 1
+
+
+async def test_pool_stats_read_query_count_from_registry(client):
+    admin = await create_user('admin@example.com', role_id=2)
+    await login(client, admin.email)
+
+    queries = (await client.get('/internal/pool')).json()['queries']
+    assert 0 < queries <= db_queries_total.total()
+
+
+async def test_request_counter_of_the_caller_is_reused(client):
+    # Так считает запросы нагрузочный клиент benchmarks.load, вызывающий приложение в том же процессе
+    stats = RequestDBStats()
+    token = current_request_db.set(stats)
+    try:
+        await client.get('/api/blogs')
+    finally:
+        current_request_db.reset(token)
+    assert stats.queries > 0
+
+
+async def test_export_queries_are_labelled_with_the_dao_method(db):
+    author = await create_user()
+    await create_blog(author.id)
+
+    label = ('BlogDAO.stream_export',)
+    queries = db_queries_total._values.get(label, 0)
+    chunks = [chunk async for chunk in BlogDAO.stream_export(db=db)]
+
+    assert chunks
+    assert db_queries_total._values.get(label, 0) > queries
+    assert current_dao_method.get() == 'none'
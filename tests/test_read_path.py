@@ -0,0 +1,54 @@
+import pytest
+from fastapi.encoders import jsonable_encoder
+from app.api.dao import BlogDAO
+from app.api.models import MBlogFullResponse
+from .conftest import IS_SQLITE, create_user, create_blog
+
+
+pytestmark = [
+    pytest.mark.anyio,
+    # Core-путь агрегирует теги через json_agg, его можно проверить только на PostgreSQL
+    pytest.mark.skipif(IS_SQLITE, reason='Core-путь чтения требует PostgreSQL (TEST_DATABASE_URL)'),
+]
+
+
+def sort_tags(blog: dict) -> dict:
+    # Порядок тегов у relationship не задан, Core-путь сортирует их по id
+    return {**blog, 'tags': sorted(blog['tags'], key=lambda tag: tag['id'])}
+
+
+async def read_both_paths(monkeypatch, read):
+    results = {}
+    for read_path in ('orm', 'core'):
+        monkeypatch.setattr(BlogDAO, 'read_path', read_path)
+        results[read_path] = await read()
+    return results['orm'], results['core']
+
+
+async def test_full_blog_is_the_same_on_orm_and_core_paths(db, monkeypatch):
+    author = await create_user()
+    blog_id = await create_blog(author.id, title='Питон', tags=['python', 'asyncio'])
+
+    async def read():
+        blog = await BlogDAO.get_full_blog_info(db=db, blog_id=blog_id)
+        return sort_tags(MBlogFullResponse.model_validate(blog).model_dump())
+
+    orm, core = await read_both_paths(monkeypatch, read)
+    assert core == orm
+    assert core['user']['id'] == author.id
+    assert [tag['name'] for tag in core['tags']] == ['python', 'asyncio']
+
+
+@pytest.mark.parametrize('view', ['full', 'summary'])
+async def test_feed_page_is_the_same_on_orm_and_core_paths(db, monkeypatch, view):
+    author = await create_user()
+    await create_blog(author.id, title='Питон', tags=['python', 'asyncio'])
+    await create_blog(author.id, title='Без тегов')
+
+    async def read():
+        page = jsonable_encoder(await BlogDAO.get_list_blog(db=db, view=view))
+        return {**page, 'blogs': [sort_tags(blog) for blog in page['blogs']]}
+
+    orm, core = await read_both_paths(monkeypatch, read)
+    assert core == orm
+    assert [len(blog['tags']) for blog in core['blogs']] == [0, 2]
@@ -0,0 +1,168 @@
+import fakeredis
+import pytest
+from fastapi.encoders import jsonable_encoder
+from app.api import dao, services
+from app.api.services import get_feed_page
+from app.database.db import AsyncSession
+from app.metrics import RequestDBStats, current_request_db
+from app.response_cache import RedisResponseCache
+from .conftest import create_user, create_blog, login
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def read_feed_page(**params) -> tuple[dict, int]:
+    """Страница ленты через кэш ответов и количество выполненных при этом запросов к БД."""
+    stats = RequestDBStats()
+    token = current_request_db.set(stats)
+    try:
+        async with AsyncSession() as db:
+            page = await get_feed_page(db=db, **params)
+    finally:
+        current_request_db.reset(token)
+    return jsonable_encoder(page), stats.queries
+
+
+async def test_feed_page_is_served_from_cache():
+    author = await create_user()
+    await create_blog(author.id, title='Первый')
+
+    first, queries = await read_feed_page()
+    assert queries > 0
+    second, queries = await read_feed_page()
+    assert queries == 0
+    assert second == first
+
+
+async def test_new_post_purges_cached_feed(client):
+    author = await create_user()
+    await create_blog(author.id, title='Первый')
+    await client.get('/api/blogs')
+
+    await login(client, author.email)
+    response = await client.post('/api/add_post', json={'title': 'Второй', 'content': 'Текст',
+                                                         'short_description': 'Описание'})
+    assert response.status_code == 200
+
+    response = await client.get('/api/blogs')
+    assert [blog['title'] for blog in response.json()['blogs']] == ['Второй', 'Первый']
+
+
+@pytest.fixture
+async def redis_cache():
+    """RedisResponseCache поверх fakeredis: тот же протокол команд без сервера Redis."""
+    cache = RedisResponseCache(url='redis://localhost:6379/0', ttl=30)
+    cache.client = fakeredis.FakeAsyncRedis()
+    yield cache
+    await cache.close()
+
+
+@pytest.fixture
+async def shared_cache(redis_cache, monkeypatch):
+    """Лента и инвалидация работают через RedisResponseCache (fakeredis) вместо in-memory кэша."""
+    monkeypatch.setattr(services, 'response_cache', redis_cache)
+    monkeypatch.setattr(dao, 'response_cache', redis_cache)
+    return redis_cache
+
+
+@pytest.mark.parametrize('view', ['full', 'summary'])
+async def test_redis_cache_hit_restores_page_without_db_queries(shared_cache, view, caplog):
+    author = await create_user()
+    await create_blog(author.id, title='Первый', tags=['python'])
+
+    expected, _ = await read_feed_page(view=view)
+    page, queries = await read_feed_page(view=view)
+
+    assert queries == 0
+    assert page == expected
+    assert 'не восстановлена' not in caplog.text
+
+
+@pytest.mark.parametrize('path', ['/api/blogs', '/blogs/', '/api/blogs?view=summary'])
+async def test_redis_cached_feed_renders_like_the_db_page(client, shared_cache, path):
+    author = await create_user()
+    await create_blog(author.id, title='Первый', tags=['python'])
+
+    expected = await client.get(path)
+    hits = shared_cache.hits
+    response = await client.get(path)
+
+    assert response.status_code == 200
+    assert shared_cache.hits == hits + 1
+    assert response.text == expected.text
+
+
+async def test_redis_cache_is_purged_by_new_post(client, shared_cache):
+    author = await create_user()
+    await create_blog(author.id, title='Первый')
+    await client.get('/api/blogs')
+
+    await login(client, author.email)
+    response = await client.post('/api/add_post', json={'title': 'Второй', 'content': 'Текст',
+                                                         'short_description': 'Описание'})
+    assert response.status_code == 200
+
+    response = await client.get('/api/blogs')
+    assert [blog['title'] for blog in response.json()['blogs']] == ['Второй', 'Первый']
+
+
+@pytest.mark.parametrize('path', ['/api/blogs', '/blogs/'])
+async def test_broken_cache_entry_is_a_miss(client, shared_cache, path):
+    author = await create_user()
+    await create_blog(author.id, title='Первый')
+    await client.get(path)
+
+    async for key in shared_cache.client.scan_iter(match='response_cache:feed:*'):
+        await shared_cache.client.set(key, '{"page": 1, "blogs": [{"id": "broken"}]}')
+
+    response = await client.get(path)
+    assert response.status_code == 200
+    assert 'Первый' in response.text
+
+
+async def test_redis_cache_stores_json_with_ttl(redis_cache):
+    await redis_cache.set('feed:1', {'page': 1, 'blogs': [{'id': 1}]}, tags=['author:1'])
+
+    assert await redis_cache.get('feed:1') == {'page': 1, 'blogs': [{'id': 1}]}
+    assert await redis_cache.get('feed:2') is None
+    assert 0 < await redis_cache.client.ttl('response_cache:feed:1') <= 30
+    assert redis_cache.stats()['hits'] == 1
+    assert redis_cache.stats()['misses'] == 1
+
+
+async def test_redis_cache_purges_keys_by_tag(redis_cache):
+    await redis_cache.set('feed:author-1', {'page': 1}, tags=['author:1', 'feed:all'])
+    await redis_cache.set('feed:author-2', {'page': 1}, tags=['author:2'])
+    await redis_cache.set('feed:tag', {'page': 1}, tags=['tag:python', 'author:1'])
+
+    assert await redis_cache.purge_tags(['author:1']) == 2
+    assert await redis_cache.get('feed:author-1') is None
+    assert await redis_cache.get('feed:tag') is None
+    assert await redis_cache.get('feed:author-2') == {'page': 1}
+    # Множества тегов удаленных записей тоже удаляются
+    assert not await redis_cache.client.exists('response_cache:tag:author:1')
+    assert await redis_cache.purge_tags(['author:1']) == 0
+
+
+async def test_redis_cache_clear_removes_only_own_keys(redis_cache):
+    await redis_cache.client.set('other:key', 'value')
+    await redis_cache.set('feed:1', {'page': 1}, tags=['feed:all'])
+
+    await redis_cache.clear()
+    assert await redis_cache.get('feed:1') is None
+    assert await redis_cache.client.get('other:key') == b'value'
+
+
+class BrokenRedis:
+    async def get(self, key):
+        return b'{not json'
+
+
+async def test_redis_cache_treats_invalid_json_as_miss():
+    cache = RedisResponseCache(url='redis://localhost:6379/0')
+    cache.client = BrokenRedis()
+
+    assert await cache.get('feed:key') is None
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['errors'] == 1
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import event
+from app.database.db import engine
+from .conftest import create_user, create_blog, login
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def checkouts():
+    """Количество выдач соединений из пула (событие checkout) за время теста."""
+    counter = {'count': 0}
+
+    def on_checkout(*args):
+        counter['count'] += 1
+
+    event.listen(engine.sync_engine, 'checkout', on_checkout)
+    yield counter
+    event.remove(engine.sync_engine, 'checkout', on_checkout)
+
+
+async def request_checkouts(checkouts, request) -> tuple:
+    checkouts['count'] = 0
+    response = await request
+    return response, checkouts['count']
+
+
+async def test_blog_api_uses_one_connection_per_request(client, checkouts):
+    author = await create_user()
+    blog_id = await create_blog(author.id, tags=['python'])
+
+    # Валидаторы условного GET и загрузка блога работают в одной сессии запроса
+    response, count = await request_checkouts(checkouts, client.get(f'/api/get_blog/{blog_id}'))
+    assert response.status_code == 200
+    assert count == 1
+
+
+async def test_authenticated_blog_api_uses_one_connection_per_request(client, checkouts):
+    author = await create_user()
+    blog_id = await create_blog(author.id, status='draft')
+    await login(client, author.email)
+
+    # Пользователь, валидаторы и блог загружаются через одну и ту же сессию
+    response, count = await request_checkouts(checkouts, client.get(f'/api/get_blog/{blog_id}'))
+    assert response.status_code == 200
+    assert response.json()['id'] == blog_id
+    assert count == 1
+
+
+async def test_feed_uses_one_connection_per_request(client, checkouts):
+    author = await create_user()
+    await create_blog(author.id)
+
+    response, count = await request_checkouts(checkouts, client.get('/api/blogs'))
+    assert response.status_code == 200
+    assert count == 1
+
+
+async def test_blog_page_revalidation_uses_one_connection(client, checkouts):
+    author = await create_user()
+    blog_id = await create_blog(author.id)
+    etag = (await client.get(f'/blogs/{blog_id}/')).headers['etag']
+
+    response, count = await request_checkouts(
+        checkouts, client.get(f'/blogs/{blog_id}/', headers={'If-None-Match': etag}))
+    assert response.status_code == 304
+    assert count == 1
+
+
+async def test_blog_page_never_holds_two_connections(client):
+    author = await create_user()
+    blog_id = await create_blog(author.id)
+    peak = {'current': 0, 'max': 0}
+
+    def on_checkout(*args):
+        peak['current'] += 1
+        peak['max'] = max(peak['max'], peak['current'])
+
+    def on_checkin(*args):
+        peak['current'] -= 1
+
+    event.listen(engine.sync_engine, 'checkout', on_checkout)
+    event.listen(engine.sync_engine, 'checkin', on_checkin)
+    try:
+        response = await client.get(f'/blogs/{blog_id}/')
+    finally:
+        event.remove(engine.sync_engine, 'checkout', on_checkout)
+        event.remove(engine.sync_engine, 'checkin', on_checkin)
+
+    # Соединение запроса возвращается в пул до общей загрузки страницы (single-flight)
+    assert response.status_code == 200
+    assert peak['max'] == 1
@@ -0,0 +1,31 @@
+import pytest
+from .conftest import create_user, create_blog
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def blog_titles(client, **params) -> set:
+    response = await client.get('/api/blogs', params=params)
+    assert response.status_code == 200
+    return {blog['title'] for blog in response.json()['blogs']}
+
+
+async def test_tag_filter_matches_substring_by_default(client):
+    author = await create_user()
+    await create_blog(author.id, title='Питон', tags=['python'])
+    await create_blog(author.id, title='Раст', tags=['rust'])
+
+    # Как и до индексного фильтра, tag ищется по подстроке без учета регистра
+    assert await blog_titles(client, tag='PYTH') == {'Питон'}
+
+
+async def test_tag_filter_modes(client):
+    author = await create_user()
+    await create_blog(author.id, title='Питон', tags=['python'])
+    await create_blog(author.id, title='Питон 3', tags=['python3'])
+
+    assert await blog_titles(client, tag='python', tag_match='exact') == {'Питон'}
+    assert await blog_titles(client, tag='pyth', tag_match='exact') == set()
+    assert await blog_titles(client, tag='pyth', tag_match='prefix') == {'Питон', 'Питон 3'}
+    assert await blog_titles(client, tag='thon3', tag_match='prefix') == set()